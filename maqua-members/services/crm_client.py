@@ -10,6 +10,20 @@ import requests
 from . import config
 from .token_service import TOKEN_SERVICE
 
+try:
+    # orjson（Rust 實作）對含中文的巢狀 payload 編碼快數倍；缺少時退回標準庫
+    import orjson
+except ImportError:
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_body(json_body: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(json_body)
+    return json.dumps(json_body, ensure_ascii=False).encode("utf-8")
+
 
 class CRMClient:
     def __init__(self) -> None:
@@ -29,9 +43,18 @@ class CRMClient:
         if params:
             req_params.update(params)
 
-        resp = requests.request(
-            method, url, params=req_params, json=json_body, timeout=15
-        )
+        if json_body is not None:
+            # 先自行序列化再以 data= 送出，POST 走 orjson 快路徑
+            resp = requests.request(
+                method,
+                url,
+                params=req_params,
+                data=_encode_body(json_body),
+                headers=_JSON_HEADERS,
+                timeout=15,
+            )
+        else:
+            resp = requests.request(method, url, params=req_params, timeout=15)
         try:
             resp.raise_for_status()
         except requests.HTTPError as exc:
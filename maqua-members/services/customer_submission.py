@@ -10,7 +10,9 @@ import importlib.util
 import re
 import logging
 import calendar
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, date
 import copy
 from uuid import uuid4
@@ -20,6 +22,26 @@ from datetime import timedelta
 
 from .crm_client import CRMClient
 
+try:
+    # orjson（Rust 實作）對含大量中文的 payload 編碼快數倍；缺少時退回標準庫
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+# 提交熱路徑用的預編譯樣式：付款代碼（兩三位數字）、安裝位置誤填客戶行的偵測
+_PAYMENT_CODE_RE = re.compile(r"\d{2,3}")
+_INSTALL_LOC_BAD_RE = re.compile(r"C\d+.+\d{6,}")
+
+
 def _ensure_builder_path() -> bool:
     """確保 customer_builder 所在的 `新增優化` 目錄已加入 sys.path。"""
     candidates = []
@@ -129,12 +151,17 @@ RAW_TEXT_BY_CUSTOMER_CODE: Dict[str, str] = {}
 _STAGE_CACHE: Dict[str, str] = {}
 _TRANS_TYPE_CACHE: Dict[str, str] = {}
 
-# 統一任務負責人：預設用客服003，可用環境覆蓋
+# 統一任務負責人：預設用客服003，可用環境覆蓋。
+# env 只在載入時讀一次，之後每個任務 payload 重用同一對字串物件
+_TASK_OWNER: Tuple[str, str] = (
+    (os.getenv("CFG_TASK_OWNER_ID") or "1482551268133044232").strip(),
+    (os.getenv("CFG_TASK_OWNER_NAME") or "客服003").strip(),
+)
+
+
 def _task_owner(settings: SubmissionSettings) -> Tuple[str, str]:
     # 固定任務負責人為客服003，除非外部環境覆蓋
-    owner_id = os.getenv("CFG_TASK_OWNER_ID") or "1482551268133044232"
-    owner_name = os.getenv("CFG_TASK_OWNER_NAME") or "客服003"
-    return owner_id.strip(), owner_name.strip()
+    return _TASK_OWNER
 
 def _env(key: str, default: str) -> str:
     return os.getenv(key, default)
@@ -210,7 +237,8 @@ DEFAULT_STAGE_BUY_PROCESS_STAGE_ID = "1607907035615068211"
 
 
 
-@dataclass
+# frozen+slots：欄位全是啟動時讀定的 env 值，凍結後屬性讀取走 slot 描述器更快
+@dataclass(frozen=True, slots=True)
 class SubmissionSettings:
     system_source: str = _env("CFG_SYSTEM_SOURCE", "auto_crm")
     bustype_id: str = _env("CFG_CUSTOMER_BUSTYPE_ID", "1779393122472558598")
@@ -264,6 +292,15 @@ class SubmissionSettings:
     opportunity_system_code: str = _env("CFG_OPPORTUNITY_SYSTEM_CODE", "opptOpenApIAdd")
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> SubmissionSettings:
+    """設定值全部來自啟動時的環境變數，整個行程共用同一份實例即可。
+
+    若測試需要在改過環境變數後重讀，呼叫 ``get_settings.cache_clear()``。
+    """
+    return SubmissionSettings()
+
+
 def _text_map(value: str) -> Dict[str, str]:
     return {"zh_TW": value, "zh_CN": value}
 
@@ -374,6 +411,17 @@ def _resolve_payment_industry_id(
     return default_id or None
 
 
+# 使用方式正規化：租系/買系寫法統一為 CRM 顯示用語
+_USAGE_NORMALIZE = {
+    "租": "租用",
+    "租用": "租用",
+    "買": "買斷",
+    "買斷": "買斷",
+    "買入": "買斷",
+    "購買": "買斷",
+    "购买": "買斷",
+}
+
 # 付款方式代码到中文名称的映射
 PAYMENT_CODE_TO_LABEL = {
     "01": "一次性全繳",
@@ -432,6 +480,40 @@ def _apply_new_customer_code(normalized: Dict[str, Any]) -> Optional[str]:
     return new_code
 
 
+def _patch_payloads_after_code_change(
+    apply_payload: Dict[str, Any],
+    duplicate_payload: Dict[str, Any],
+    normalized: Dict[str, Any],
+    settings: SubmissionSettings,
+) -> None:
+    """換碼重試只動到編碼衍生欄位，就地修補既有 payload，免整份重建。"""
+    new_code = normalized.get("customerCode") or ""
+    display_name = normalized.get("displayName") or ""
+    short_name = normalized.get("shortName") or ""
+    person_label = (
+        short_name or normalized.get("baseName") or normalized.get("contactName") or "聯絡人"
+    )
+
+    dup_data = duplicate_payload.get("data")
+    if isinstance(dup_data, dict):
+        dup_data["name"] = display_name
+        dup_data["code"] = new_code
+
+    data = apply_payload.get("data")
+    if not isinstance(data, dict):
+        return
+    data["name"] = _text_map(display_name or short_name or "新客戶")
+    data["shortname"] = _text_map(short_name or display_name or "新客戶")
+    data["custCode"] = new_code
+    data["merchantAppliedDetail!searchcode"] = f"{settings.searchcode_prefix}{new_code}"
+    data["enterpriseName"] = display_name
+    data["leaderName"] = person_label
+    data["personName"] = person_label
+    addresses = data.get("merchantAddressInfos")
+    if isinstance(addresses, list) and addresses:
+        addresses[0]["addressCode"] = _fallback_address_code(normalized)
+
+
 def _determine_contract_years(
     plan_text: str, settings: SubmissionSettings
 ) -> int:
@@ -811,7 +893,7 @@ def create_opportunity_from_session(token: str) -> Dict[str, Any]:
     entry = _get_opportunity_session(str(token).strip())
     normalized = copy.deepcopy(entry.get("normalized") or {})
     application_response = copy.deepcopy(entry.get("applicationResponse") or {})
-    settings = SubmissionSettings()
+    settings = get_settings()
     client = CRMClient()
     result = _create_opportunity_for_customer(
         normalized,
@@ -890,10 +972,12 @@ def _resolve_trans_type_value(
     return None
 
 
-def _generate_opportunity_code(customer_code: Optional[str] = None) -> str:
+def _generate_opportunity_code(
+    customer_code: Optional[str] = None, *, now: Optional[datetime] = None
+) -> str:
     prefix = (customer_code or "OPPT")[:6].upper()
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"{prefix}{timestamp}"
+    stamp = now or datetime.now()
+    return f"{prefix}{stamp:%Y%m%d%H%M%S}"
 
 # 客戶相關 payload builders
 def build_duplicate_payload(
@@ -920,6 +1004,17 @@ def build_apply_payload(
 ) -> Dict[str, Any]:
     now = datetime.now()
     apply_code = f"CUST{now:%Y%m%d%H%M%S}"
+
+    # 名稱/簡稱/聯絡人常常是同一字串，build 內做小快取避免重複配置 dict
+    # （_cleanup 會重建巢狀 dict，回傳結果不會共用同一實例）
+    _text_map_cache: Dict[str, Dict[str, str]] = {}
+
+    def _cached_text_map(value: str) -> Dict[str, str]:
+        cached = _text_map_cache.get(value)
+        if cached is None:
+            cached = _text_map_cache[value] = _text_map(value)
+        return cached
+
     sale_area = normalized.get("saleArea") or {}
     owner = normalized.get("owner") or {}
     owner_hint = (normalized.get("ownerHint") or "").strip().lower()
@@ -956,7 +1051,7 @@ def build_apply_payload(
         "isDefault": True,
         "org": settings.sales_org_id,
         "dept": settings.applicant_dept_id,
-        "fullName": _text_map(contact_name),
+        "fullName": _cached_text_map(contact_name),
         "mobile": contact_tel,
         "telePhone": contact_tel,
         "_status": "Insert",
@@ -1022,10 +1117,10 @@ def build_apply_payload(
         "ower": owner.get("id") or settings.applicant_user_id,
         "dept": dept_id,
         "saleArea": sale_area.get("id"),
-        "name": _text_map(
+        "name": _cached_text_map(
             normalized.get("displayName") or normalized.get("shortName") or "新客戶"
         ),
-        "shortname": _text_map(
+        "shortname": _cached_text_map(
             normalized.get("shortName") or normalized.get("displayName") or "新客戶"
         ),
         "custCode": normalized.get("customerCode"),
@@ -1057,7 +1152,9 @@ def build_apply_payload(
         "website": "",
         "wid": "",
         "largeText1": (normalized.get("usageMode") or {}).get("label"),
+        "largeText2": plan_value,
         "largeText3": normalized.get("monthlyFee"),
+        "largeText4": remark_value,
         "principals": [
             {
                 "isDefault": True,
@@ -1082,34 +1179,40 @@ def build_apply_payload(
         "merchantAppliedDetail!merchantApplyRangeDetailCharacter": {},
         "merchantCharacterEntity!merchantCharacter": {},
     }
-    if plan_value:
-        payload["largeText2"] = plan_value
-    if remark_value:
-        payload["largeText4"] = remark_value
     default_payment_field = "merchantAppliedDetail!payway"
-    _assign_field(payload, default_payment_field, payment_code)
+    extras: Dict[str, Any] = {default_payment_field: payment_code}
     custom_payment_field = settings.payment_field
     if (
         custom_payment_field
         and custom_payment_field != default_payment_field
     ):
-        payment_value_for_custom = payment_label or payment_code
-        _assign_field(payload, custom_payment_field, payment_value_for_custom)
-    _assign_field(payload, settings.plan_field, normalized.get("installContent"))
-    _assign_field(payload, settings.remark_field, normalized.get("remark"))
-    
-    # 設置 customerIndustry.name 字段，用於存儲支付方式描述
-    # 根據用戶反饋，這是訂製的存儲位置
-    if customer_industry.get("name"):
-        _assign_field(payload, "customerIndustry.name", customer_industry.get("name"))
-    
+        extras[custom_payment_field] = payment_label or payment_code
+    extras[settings.plan_field] = normalized.get("installContent")
+    extras[settings.remark_field] = normalized.get("remark")
     # 強制綁定「使用方式」與「月費」到指定欄位，避免 UI 僅顯示 character 欄位而忽略 largeText1/3
-    _assign_field(
-        payload,
-        settings.usage_field,
-        (normalized.get("usageMode") or {}).get("label"),
+    extras[settings.usage_field] = (normalized.get("usageMode") or {}).get("label")
+    extras[settings.monthly_fee_field] = normalized.get("monthlyFee")
+    # 平面欄位一次 update 合併；帶 `.` / `__` 巢狀語法的欄位仍交給 _assign_field 展開
+    payload.update(
+        {
+            key: value
+            for key, value in extras.items()
+            if key
+            and "." not in key
+            and "__" not in key
+            and value not in (None, "", [], {})
+        }
     )
-    _assign_field(payload, settings.monthly_fee_field, normalized.get("monthlyFee"))
+    for key, value in extras.items():
+        if key and ("." in key or "__" in key):
+            _assign_field(payload, key, value)
+
+    # 設置 customerIndustry.name 字段，用於存儲支付方式描述
+    # 根據用戶反饋，這是訂製的存儲位置
+    # customerIndustry 主欄位放的是 ID 字串，展開巢狀無效，直接以字面鍵寫入
+    industry_name = customer_industry.get("name")
+    if industry_name:
+        payload["customerIndustry.name"] = industry_name
     return {"data": _cleanup(payload)}
 
 
@@ -1182,8 +1285,19 @@ def _build_opportunity_create_payload(
             context["contractEndDate"] = _date_to_string(
                 _add_years(start_date, int(contract_years))
             )
+    # 之後不再回寫這些欄位，先一次取出到 locals，避免重複 dict 查找
+    contract_start = context.get("contractStartDate")
+    contract_end = context.get("contractEndDate")
+    monthly_fee = context.get("monthlyFee")
+    prepay_amount = context.get("prepay")
+    deposit_amount = context.get("deposit")
+    plan_value = context.get("planType")
+    location_value = context.get("installLocation")
+    payment_code = context.get("paymentCode")
+    usage_label = context.get("usageLabel")
+    remark_raw = context.get("remark")
     # 描述僅用使用者備註，避免自動拼接金額/聯絡方式干擾顯示
-    remark_text = context.get("remark") or ""
+    remark_text = remark_raw or ""
     # character_payload 初始化为空字典即可，后面在 headDef 部分统一设置
     character_payload: Dict[str, Any] = {}
     
@@ -1201,7 +1315,7 @@ def _build_opportunity_create_payload(
         "code": opportunity_code,
         "resubmitCheckKey": opportunity_code,
         # 修正：商机名称优先使用安装位置（地址），如果为空才使用客户名称
-        "name": context.get("installLocation") or context.get("address") or context.get("name"),
+        "name": location_value or context.get("address") or context.get("name"),
         "customer": customer_ref,
         "settleCustomer": customer_ref,
         "finalUser": customer_ref,
@@ -1216,19 +1330,19 @@ def _build_opportunity_create_payload(
         "expectSignMoney": _format_amount(context.get("expectSignMoney")),
         "expectSignDate": context.get("expectSignDate"),
         "expectFee": None,
-        "address": context.get("installLocation"),
+        "address": location_value,
         "expectTenderDate": context.get("expectTenderDate"),
         "ower": owner_id,
         "dept": settings.applicant_dept_id,
         "saleArea": context.get("saleAreaId"),
         "org": settings.sales_org_id,
         # 描述僅顯示備註（避免整段輸入佔用描述欄）
-        "description": remark_text or context.get("planType") or normalized.get("installContent"),
+        "description": remark_text or plan_value or normalized.get("installContent"),
         "regionCode": settings.default_region_code or None,
-        "contractBeginDate": context.get("contractStartDate"),
-        "contractEndDate": context.get("contractEndDate"),
+        "contractBeginDate": contract_start,
+        "contractEndDate": contract_end,
         "contractYear": contract_years,
-        "remark": remark_text or context.get("remark"),
+        "remark": remark_text or remark_raw,
         "opptDefineCharacter": character_payload if character_payload else {},
         "opptItemList": item_payload,
         "_status": "Insert",
@@ -1236,7 +1350,7 @@ def _build_opportunity_create_payload(
     }
     
     # 调试日志：打印关键字段上下文
-    print(f"[DEBUG] Opportunity Context: paymentCode={context.get('paymentCode')}, usageLabel={context.get('usageLabel')}, deposit={context.get('deposit')}, prepay={context.get('prepay')}")
+    print(f"[DEBUG] Opportunity Context: paymentCode={payment_code}, usageLabel={usage_label}, deposit={deposit_amount}, prepay={prepay_amount}")
 
     head_def = data.setdefault("headDef", {})
     oppt_char = data.setdefault("opptDefineCharacter", {})
@@ -1249,7 +1363,6 @@ def _build_opportunity_create_payload(
     # --- 1. 目前付款方式 (Payment Method) ---
     # 根据真实 CRM 数据（C4612），付款方式应该写入 industry 字段
     # 这与客户创建的逻辑一致（customer_builder.py:527）
-    payment_code = context.get("paymentCode")
     if payment_code:
         # 解析付款方式对应的 industry ID
         industry_id = _resolve_payment_industry_id(payment_code, settings)
@@ -1263,12 +1376,7 @@ def _build_opportunity_create_payload(
         
     # --- 2. 使用方式 (Usage Mode) ---
     # 使用方式對應 define8 / attrext8；交易類型名稱放在 transType_name
-    usage_label = context.get("usageLabel")
-    normalized_usage = usage_label
-    if usage_label in ("租", "租用"):
-        normalized_usage = "租用"
-    elif usage_label in ("買", "買斷", "買入", "購買", "购买"):
-        normalized_usage = "買斷"
+    normalized_usage = _USAGE_NORMALIZE.get(usage_label, usage_label)
     if usage_label:
         head_def["define8"] = str(normalized_usage)
         data["headDef!define8"] = str(normalized_usage)
@@ -1282,7 +1390,6 @@ def _build_opportunity_create_payload(
         
     # --- 3. 方案類型 / 安裝位置 ---
     # 根据 C4612 真实数据：define9/attrext9 是方案类型
-    plan_value = context.get("planType")
     if plan_value:
         # 方案类型写入 define9/attrext9
         head_def["define9"] = str(plan_value)
@@ -1290,11 +1397,10 @@ def _build_opportunity_create_payload(
         oppt_char["attrext9"] = str(plan_value)
     
     # 安装位置单独处理，写入 address 和可能的其他字段
-    location_value = context.get("installLocation")
     addr_fallback = normalized.get("address") or ""
     
     # 如果 location 像客戶編碼+姓名且有地址，換成地址
-    if location_value and re.search(r"C\d+.+\d{6,}", str(location_value)):
+    if location_value and _INSTALL_LOC_BAD_RE.search(str(location_value)):
         if addr_fallback:
             location_value = addr_fallback
     
@@ -1304,71 +1410,38 @@ def _build_opportunity_create_payload(
         data["address"] = str(final_location)
     
     # --- 3B. 合约相关字段 - 广撒网策略 ---
-    # 合约开始日期
-    if context.get("contractStartDate"):
-        data["contractBeginDate"] = context["contractStartDate"]
-        data["contractStartDate"] = context["contractStartDate"]
-        head_def["define17"] = context["contractStartDate"]
-        oppt_char["attrext2"] = context["contractStartDate"]
-    
-    # 合约结束日期
-    if context.get("contractEndDate"):
-        data["contractEndDate"] = context["contractEndDate"]
-        data["contractEnd"] = context["contractEndDate"]
-        head_def["define18"] = context["contractEndDate"]
-        oppt_char["attrext3"] = context["contractEndDate"]
-    
-    # 合约年期
-    contract_years = context.get("contractYears")
-    if contract_years:
-        data["contractYear"] = contract_years
-        data["contractYears"] = contract_years
-        head_def["define19"] = str(contract_years)
-        oppt_char["attrext4"] = str(contract_years)
-    
-    
-    # --- 4. 月费 (Monthly Fee) - 广撒网策略 ---
-    # 尝试写入多个可能的字段位置，提高命中率
-    if context.get("monthlyFee") is not None:
-        try:
-            monthly_float = float(context.get("monthlyFee"))
-            monthly_str = _format_amount(context.get("monthlyFee"))
-            
-            # 只写入核心字段，避免冲突
-            head_def["define10"] = monthly_str
-            data["headDef!define10"] = monthly_str
-            oppt_char["attrext10"] = monthly_float
-            data["monthlyFee"] = monthly_float
-        except (ValueError, TypeError):
-            pass
-    
-    # --- 5. 预缴金 (Prepay) ---
-    # 根據實際 CRM 數據（如 2025111115447），預繳金落在 define11 / attrext16
-    if context.get("prepay") is not None:
-        try:
-            prepay_float = float(context.get("prepay"))
-            prepay_str = _format_amount(context.get("prepay"))
-            
-            head_def["define11"] = prepay_str
-            data["headDef!define11"] = prepay_str
-            oppt_char["attrext16"] = prepay_float
-            data["prepay"] = prepay_float
-        except (ValueError, TypeError):
-            pass
-    
-    # --- 6. 按金 (Deposit) ---
-    # 按金對應 define12 / attrext17
-    if context.get("deposit") is not None:
+    # 合約開始/結束日與年期：同值寫入主欄位與 headDef/opptDefineCharacter 自訂欄位
+    for value, def_key, attr_key, data_keys in (
+        (contract_start, "define17", "attrext2", ("contractBeginDate", "contractStartDate")),
+        (contract_end, "define18", "attrext3", ("contractEndDate", "contractEnd")),
+        (contract_years, "define19", "attrext4", ("contractYear", "contractYears")),
+    ):
+        if not value:
+            continue
+        for data_key in data_keys:
+            data[data_key] = value
+        head_def[def_key] = str(value)
+        oppt_char[attr_key] = str(value)
+
+    # --- 4/5/6. 月費 / 預繳金 / 按金 - 广撒网策略 ---
+    # 金額欄位：headDef 存格式化字串，opptDefineCharacter 與主欄位存數值
+    # （月費=define10/attrext10，預繳金=define11/attrext16，按金=define12/attrext17）
+    for raw_amount, def_key, attr_key, data_key in (
+        (monthly_fee, "define10", "attrext10", "monthlyFee"),
+        (prepay_amount, "define11", "attrext16", "prepay"),
+        (deposit_amount, "define12", "attrext17", "deposit"),
+    ):
+        if raw_amount is None:
+            continue
         try:
-            deposit_float = float(context.get("deposit"))
-            deposit_str = _format_amount(context.get("deposit"))
-            
-            head_def["define12"] = deposit_str
-            data["headDef!define12"] = deposit_str
-            oppt_char["attrext17"] = deposit_float
-            data["deposit"] = deposit_float
+            amount_float = float(raw_amount)
         except (ValueError, TypeError):
-            pass
+            continue
+        amount_str = _format_amount(raw_amount)
+        head_def[def_key] = amount_str
+        data[f"headDef!{def_key}"] = amount_str
+        oppt_char[attr_key] = amount_float
+        data[data_key] = amount_float
 
 
     process_value = context.get("process")
@@ -1414,6 +1487,13 @@ def _build_opportunity_items(
         or context.get("expectSignDate")
         or context.get("opportunityDate")
     )
+    # 安裝日對所有行項相同，換芯日計算只解析一次
+    install_base: Optional[datetime] = None
+    if install_date:
+        try:
+            install_base = datetime.fromisoformat(str(install_date)[:10])
+        except ValueError:
+            install_base = None
 
     built: List[Dict[str, Any]] = []
     if not items:
@@ -1459,14 +1539,13 @@ def _build_opportunity_items(
         if cycle_months:
             def_char["attrext12"] = cycle_months
             try:
-                from datetime import datetime
-
-                base = datetime.fromisoformat(str(install_date)[:10])
-                month = base.month - 1 + int(cycle_months)
-                year = base.year + month // 12
+                if install_base is None:
+                    raise ValueError("install date unavailable")
+                month = install_base.month - 1 + int(cycle_months)
+                year = install_base.year + month // 12
                 month = month % 12 + 1
                 day = min(
-                    base.day,
+                    install_base.day,
                     [
                         31,
                         29
@@ -1524,152 +1603,204 @@ def _normalize_replacement_cycle(plan_type: Optional[str], item_hint: Dict[str,
         return None
 
 
-def _lookup_products(plan_type: Optional[str]) -> List[Dict[str, str]]:
+# 物料模糊比對用：一次 translate 去掉空白與破折號，取代連串 .replace
+_PLAN_NORMALIZE_TABLE = str.maketrans("", "", " -")
+
+
+# 物料對照表：於模組載入時建立一次，避免每次查詢重建整份 dict
+_PRODUCT_CATALOG: Dict[str, Dict[str, Any]] = {
+    # 套件與子件
+    "RO900S": {
+        "code": "1414",
+        "name": "RO-900S E.P微電腦可調式RO純水機",
+        "cycle": "",
+        "children": ["R-002", "R-001"],
+    },
+    "RO600G": {
+        "code": "1581",
+        "name": "EVERPOLL-RO-600G RO機",
+        "cycle": "",
+        "children": ["RO600G主", "RO500G膜", "RO500G炭", "RO500GPP"],
+    },
+    "RO600G主": {"code": "1581", "name": "EVERPOLL-RO-600G RO機", "cycle": ""},
+    "RO500G膜": {"code": "1558", "name": "RO500G 第二道RO逆滲透膜", "cycle": "24"},
+    "RO500G炭": {"code": "1559", "name": "RO500G 第三道活性炭濾芯", "cycle": "12"},
+    "RO500GPP": {"code": "1557", "name": "RO500G 第一道玄武岩合成活性PP", "cycle": "6"},
+    "ONYX": {
+        "code": "1587",
+        "name": "LIVINGCARE-Onyx-即冷熱直飲機",
+        "cycle": "",
+        "children": ["ONYX濾芯1", "ONYX濾芯2"],
+    },
+    "ONYX濾芯1": {"code": "1592", "name": "ONYX-鈣抑正電荷 E-Positive Ak Filter", "cycle": "12"},
+    "ONYX濾芯2": {"code": "1591", "name": "ONYX-活性碳PH Carbon Block Ak Filter", "cycle": "12"},
+    "CHP101": {
+        "code": "1586",
+        "name": "LIVINGCARE-CHP-101即冷熱直飲機",
+        "cycle": "",
+        "children": ["CHP101濾芯1", "CHP101濾芯2"],
+    },
+    "CHP101濾芯1": {"code": "1594", "name": "CHP101-鈣抑正電荷E-Positive Ak Filter", "cycle": "12"},
+    "CHP101濾芯2": {"code": "1593", "name": "CHP101-活性碳Carbon Block Ak Filter", "cycle": "12"},
+    "MF330": {
+        "code": None,
+        "name": "MF330 組合",
+        "cycle": "",
+        "children": ["MF110", "MF220"],
+    },
+    "MF110": {"code": "1192", "name": "MF110 EVERPOLL商用高流量飲用水過濾系統", "cycle": "12"},
+    "MF220": {"code": "1193", "name": "MF220 EVERPOLL商用高流量樹脂離子交換系統", "cycle": "6"},
+    "DC3000": {
+        "code": None,
+        "name": "DC3000 組合",
+        "cycle": None,
+        "children": ["DC2000", "DC1000"],
+    },
+    # 單一物料
+    "HS990": {"code": "1005", "name": "HS990智慧節能殺菌飲水機", "cycle": ""},
+    "HM290": {"code": "1087", "name": "HM290 直立式冰溫熱飲水機(白色)", "cycle": ""},
+    "EP298": {"code": "1116", "name": "EVERPOLL- EVB-298 智能雙溫飲水機", "cycle": ""},
+    "HM190": {"code": "1089", "name": "HM190 桌上型冰冷熱飲水機(白)", "cycle": ""},
+    "EP398": {"code": "1649", "name": "EVB-398 智能櫥下型三溫UV觸控飲水機", "cycle": ""},
+    "EP168PLUS": {"code": "1650", "name": "EP-168PLUS-廚下型調溫無壓飲水機", "cycle": ""},
+    "M3": {"code": "1613", "name": "HS-M3 櫥下型冰溫熱飲水機", "cycle": ""},
+    "十秒機": {"code": "1194", "name": "10SM EVERPOLL-十秒機(OZONE活氧)", "cycle": ""},
+    "UVC-902": {"code": "1267", "name": "UVC-902滅菌設備", "cycle": ""},
+    "MAXTEC": {"code": "1003", "name": "Maxtec X-6 紫外線殺菌燈組", "cycle": ""},
+    "壓力桶3G": {"code": "1206", "name": "壓力桶（3L)", "cycle": ""},
+    "壓力桶1.5G": {"code": "1474", "name": "壓力桶（1.5l）", "cycle": ""},
+    "龍頭": {"code": "1138", "name": "EVERPURE-TOP 原裝水龍頭", "cycle": ""},
+    "4GUV": {"code": "1199", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-4G", "cycle": "12"},
+    "6GUV": {"code": "1015", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-6G/25W", "cycle": "12"},
+    "1GUV": {"code": "1099", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-1G/6W", "cycle": "12"},
+    "12GUV": {"code": "1014", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-12G/40W", "cycle": "12"},
+    "2GUV": {"code": "1016", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-2G/16W", "cycle": "12"},
+    # UV 殺菌燈別名（部分客戶文案寫 Phillips/Philips 2G/16W）
+    # PHILIPS 2G/16W 殺菌燈 => 對應 2GUV，同步設置代碼讓 CRM 顯示名稱
+    "PHILIPS 2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "PHILLIPS 2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "PHILIPS2G16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "PHILLIPS2G16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "2GUV16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "PHILIPS 2G UV 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "PHILLIPS 2G UV 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
+    "UF": {"code": "1439", "name": "MAXTEC-UF超濾膜濾芯", "cycle": "12"},
+    "PBS400": {"code": "1183", "name": "EVERPURE-PBS400直飲過濾系統", "cycle": "12"},
+    "H104": {"code": "1182", "name": "EVERPURE-H104直飲過濾系統", "cycle": "12"},
+    "EF6000": {"code": "1217", "name": "EVERPURE-EF6000直飲過濾系統", "cycle": "12"},
+    "FH301": {"code": "1214", "name": "EVERPOLL-FH301全屋過濾系統", "cycle": "12"},
+    "FH500": {"code": "1339", "name": "EVERPOLL-FH500中央過濾系統", "cycle": "12"},
+    "FH230": {"code": "1563", "name": "EVERPOLL-FH230 全屋過濾淨系統", "cycle": "12"},
+    "FH200": {"code": "1578", "name": "EVERPOLL-FH200全屋過濾淨系統", "cycle": "12"},
+    "DC2000": {"code": "1119", "name": "EVERPOLL-DC2000 英國無納離子交換樹脂系統", "cycle": "6"},
+    "DC1000": {"code": "1120", "name": "EVERPOLL-DC1000 單道雙效複合式系統", "cycle": "12"},
+    "AHP150": {"code": "1137", "name": "EVERPOLL-AHP150中央過濾系統", "cycle": "12"},
+    "10吋PP": {"code": "1101", "name": "10吋-PP過濾棉", "cycle": "6"},
+    "20吋PP": {"code": "1100", "name": "20吋-PP過濾棉", "cycle": "6"},
+    "T33": {"code": "1017", "name": "Filter T33 Small濾芯", "cycle": "12"},
+    "CLARIS-XL": {"code": "1682", "name": "EVERPURE-CLARIS-XL", "cycle": "12"},
+    "PWCE16F10": {"code": "1512", "name": "EVERPURE軟水系統PWCE16F10", "cycle": ""},
+    "RO150G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
+    "RO100G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
+    "RO400G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
+    "雙頭MC": {"code": "1249", "name": "EVERPURE-QC71-TWIN-MC2", "cycle": ""},
+    "雙頭I2000": {"code": "1227", "name": "EVERPURE-QC71-TWIN-I20002", "cycle": ""},
+    # RO900S 專用耗材
+    "R-001": {"code": "1350", "name": "R-001多折式雙效復合濾芯", "cycle": "12"},
+    "R-002": {"code": "1351", "name": "R-002高效抗污RO膜", "cycle": "24"},
+    # MC2 耗材
+    "MC2": {"code": "1146", "name": "EVERPURE-MC2 濾芯", "cycle": "12"},
+}
+
+# 內容相同的別名項（如 PHILIPS/PHILLIPS 各種寫法）共用同一份 dict，
+# 之後才能以 id() 去重取代逐欄位的 dict 相等比較
+_canonical_entries: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+for _key, _data in _PRODUCT_CATALOG.items():
+    if _data.get("children"):
+        continue
+    _sig = (_data.get("code"), _data.get("name"), _data.get("cycle"))
+    _PRODUCT_CATALOG[_key] = _canonical_entries.setdefault(_sig, _data)
+del _canonical_entries
+
+# 載入時預先展開的衍生索引：套件 key → 子物料資料，命中父項時直接取用
+_CHILDREN_INDEX: Dict[str, List[Dict[str, Any]]] = {
+    key: [
+        _PRODUCT_CATALOG[child]
+        for child in data["children"]
+        if child in _PRODUCT_CATALOG
+    ]
+    for key, data in _PRODUCT_CATALOG.items()
+    if data.get("children")
+}
+
+# 含其他 key 子字串的 key（如 RO600G主 含 RO600G、12GUV 含 2GUV）。
+# 這些不能走 O(1) 精確命中，否則會漏掉子字串 key 的匹配結果
+_AMBIGUOUS_KEYS = {
+    key
+    for key in _PRODUCT_CATALOG
+    if any(other != key and other in key for other in _PRODUCT_CATALOG)
+}
+
+# fallback 匹配用的正規化名稱索引（去空白/破折號、大寫），避免每次查詢重算
+_FALLBACK_INDEX: Tuple[Tuple[str, Dict[str, Any]], ...] = tuple(
+    (data["name"].upper().translate(_PLAN_NORMALIZE_TABLE), data)
+    for data in _PRODUCT_CATALOG.values()
+    if data.get("name") and not data.get("children")
+)
+
+
+# 同一批物料 token（MC2、龍頭、10吋PP…）在多筆提交間反覆出現，
+# 快取結果讓重複查詢只剩一次 dict 查找；回傳 tuple 以免快取內容被改動
+@lru_cache(maxsize=512)
+def _lookup_products(plan_type: Optional[str]) -> Tuple[Dict[str, str], ...]:
     lookup = (plan_type or "").upper()
     if not lookup:
-        return []
-    catalog = {
-        # 套件與子件
-        "RO900S": {
-            "code": "1414",
-            "name": "RO-900S E.P微電腦可調式RO純水機",
-            "cycle": "",
-            "children": ["R-002", "R-001"],
-        },
-        "RO600G": {
-            "code": "1581",
-            "name": "EVERPOLL-RO-600G RO機",
-            "cycle": "",
-            "children": ["RO600G主", "RO500G膜", "RO500G炭", "RO500GPP"],
-        },
-        "RO600G主": {"code": "1581", "name": "EVERPOLL-RO-600G RO機", "cycle": ""},
-        "RO500G膜": {"code": "1558", "name": "RO500G 第二道RO逆滲透膜", "cycle": "24"},
-        "RO500G炭": {"code": "1559", "name": "RO500G 第三道活性炭濾芯", "cycle": "12"},
-        "RO500GPP": {"code": "1557", "name": "RO500G 第一道玄武岩合成活性PP", "cycle": "6"},
-        "ONYX": {
-            "code": "1587",
-            "name": "LIVINGCARE-Onyx-即冷熱直飲機",
-            "cycle": "",
-            "children": ["ONYX濾芯1", "ONYX濾芯2"],
-        },
-        "ONYX濾芯1": {"code": "1592", "name": "ONYX-鈣抑正電荷 E-Positive Ak Filter", "cycle": "12"},
-        "ONYX濾芯2": {"code": "1591", "name": "ONYX-活性碳PH Carbon Block Ak Filter", "cycle": "12"},
-        "CHP101": {
-            "code": "1586",
-            "name": "LIVINGCARE-CHP-101即冷熱直飲機",
-            "cycle": "",
-            "children": ["CHP101濾芯1", "CHP101濾芯2"],
-        },
-        "CHP101濾芯1": {"code": "1594", "name": "CHP101-鈣抑正電荷E-Positive Ak Filter", "cycle": "12"},
-        "CHP101濾芯2": {"code": "1593", "name": "CHP101-活性碳Carbon Block Ak Filter", "cycle": "12"},
-        "MF330": {
-            "code": None,
-            "name": "MF330 組合",
-            "cycle": "",
-            "children": ["MF110", "MF220"],
-        },
-        "MF110": {"code": "1192", "name": "MF110 EVERPOLL商用高流量飲用水過濾系統", "cycle": "12"},
-        "MF220": {"code": "1193", "name": "MF220 EVERPOLL商用高流量樹脂離子交換系統", "cycle": "6"},
-        "DC3000": {
-            "code": None,
-            "name": "DC3000 組合",
-            "cycle": None,
-            "children": ["DC2000", "DC1000"],
-        },
-        # 單一物料
-        "HS990": {"code": "1005", "name": "HS990智慧節能殺菌飲水機", "cycle": ""},
-        "HM290": {"code": "1087", "name": "HM290 直立式冰溫熱飲水機(白色)", "cycle": ""},
-        "EP298": {"code": "1116", "name": "EVERPOLL- EVB-298 智能雙溫飲水機", "cycle": ""},
-        "HM190": {"code": "1089", "name": "HM190 桌上型冰冷熱飲水機(白)", "cycle": ""},
-        "EP398": {"code": "1649", "name": "EVB-398 智能櫥下型三溫UV觸控飲水機", "cycle": ""},
-        "EP168PLUS": {"code": "1650", "name": "EP-168PLUS-廚下型調溫無壓飲水機", "cycle": ""},
-        "M3": {"code": "1613", "name": "HS-M3 櫥下型冰溫熱飲水機", "cycle": ""},
-        "十秒機": {"code": "1194", "name": "10SM EVERPOLL-十秒機(OZONE活氧)", "cycle": ""},
-        "UVC-902": {"code": "1267", "name": "UVC-902滅菌設備", "cycle": ""},
-        "MAXTEC": {"code": "1003", "name": "Maxtec X-6 紫外線殺菌燈組", "cycle": ""},
-        "壓力桶3G": {"code": "1206", "name": "壓力桶（3L)", "cycle": ""},
-        "壓力桶1.5G": {"code": "1474", "name": "壓力桶（1.5l）", "cycle": ""},
-        "龍頭": {"code": "1138", "name": "EVERPURE-TOP 原裝水龍頭", "cycle": ""},
-        "4GUV": {"code": "1199", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-4G", "cycle": "12"},
-        "6GUV": {"code": "1015", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-6G/25W", "cycle": "12"},
-        "1GUV": {"code": "1099", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-1G/6W", "cycle": "12"},
-        "12GUV": {"code": "1014", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-12G/40W", "cycle": "12"},
-        "2GUV": {"code": "1016", "name": "PHILIPS-UV-SET 紫外線殺菌燈組-2G/16W", "cycle": "12"},
-        # UV 殺菌燈別名（部分客戶文案寫 Phillips/Philips 2G/16W）
-        # PHILIPS 2G/16W 殺菌燈 => 對應 2GUV，同步設置代碼讓 CRM 顯示名稱
-        "PHILIPS 2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "PHILLIPS 2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "PHILIPS2G16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "PHILLIPS2G16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "2G/16W 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "2GUV16W": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "PHILIPS 2G UV 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "PHILLIPS 2G UV 殺菌燈": {"code": "1016", "name": "PHILIPS 2G/16W 殺菌燈", "cycle": "12"},
-        "UF": {"code": "1439", "name": "MAXTEC-UF超濾膜濾芯", "cycle": "12"},
-        "PBS400": {"code": "1183", "name": "EVERPURE-PBS400直飲過濾系統", "cycle": "12"},
-        "H104": {"code": "1182", "name": "EVERPURE-H104直飲過濾系統", "cycle": "12"},
-        "EF6000": {"code": "1217", "name": "EVERPURE-EF6000直飲過濾系統", "cycle": "12"},
-        "FH301": {"code": "1214", "name": "EVERPOLL-FH301全屋過濾系統", "cycle": "12"},
-        "FH500": {"code": "1339", "name": "EVERPOLL-FH500中央過濾系統", "cycle": "12"},
-        "FH230": {"code": "1563", "name": "EVERPOLL-FH230 全屋過濾淨系統", "cycle": "12"},
-        "FH200": {"code": "1578", "name": "EVERPOLL-FH200全屋過濾淨系統", "cycle": "12"},
-        "DC2000": {"code": "1119", "name": "EVERPOLL-DC2000 英國無納離子交換樹脂系統", "cycle": "6"},
-        "DC1000": {"code": "1120", "name": "EVERPOLL-DC1000 單道雙效複合式系統", "cycle": "12"},
-        "AHP150": {"code": "1137", "name": "EVERPOLL-AHP150中央過濾系統", "cycle": "12"},
-        "10吋PP": {"code": "1101", "name": "10吋-PP過濾棉", "cycle": "6"},
-        "20吋PP": {"code": "1100", "name": "20吋-PP過濾棉", "cycle": "6"},
-        "T33": {"code": "1017", "name": "Filter T33 Small濾芯", "cycle": "12"},
-        "CLARIS-XL": {"code": "1682", "name": "EVERPURE-CLARIS-XL", "cycle": "12"},
-        "PWCE16F10": {"code": "1512", "name": "EVERPURE軟水系統PWCE16F10", "cycle": ""},
-        "RO150G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
-        "RO100G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
-        "RO400G": {"code": "1019", "name": 'Filter PP1um 10"濾芯', "cycle": "6"},
-        "雙頭MC": {"code": "1249", "name": "EVERPURE-QC71-TWIN-MC2", "cycle": ""},
-        "雙頭I2000": {"code": "1227", "name": "EVERPURE-QC71-TWIN-I20002", "cycle": ""},
-        # RO900S 專用耗材
-        "R-001": {"code": "1350", "name": "R-001多折式雙效復合濾芯", "cycle": "12"},
-        "R-002": {"code": "1351", "name": "R-002高效抗污RO膜", "cycle": "24"},
-        # MC2 耗材
-        "MC2": {"code": "1146", "name": "EVERPURE-MC2 濾芯", "cycle": "12"},
-    }
+        return ()
+    # 快速路徑：token 本身就是目錄 key 時 O(1) 命中，跳過整趟掃描
+    direct = _PRODUCT_CATALOG.get(lookup)
+    if direct is not None and lookup not in _AMBIGUOUS_KEYS:
+        if direct.get("children"):
+            return tuple(_CHILDREN_INDEX[lookup])
+        return (direct,)
     results: List[Dict[str, str]] = []
-    
-    # 第一步：精確匹配（key 在 lookup 中）
-    for key, data in catalog.items():
+    # 目錄資料皆為模組層單例，用 id() 去重避免逐欄位比較整個 dict
+    seen_ids: set = set()
+
+    # 第一步：精確匹配（key 在 lookup 中），單趟掃描預建索引
+    for key, data in _PRODUCT_CATALOG.items():
         if key in lookup:
             # 如果有 children，僅加入子物料，忽略父項
             if data.get("children"):
-                for child in data["children"]:
-                    child_data = catalog.get(child)
-                    if child_data and child_data not in results:
+                for child_data in _CHILDREN_INDEX[key]:
+                    if id(child_data) not in seen_ids:
+                        seen_ids.add(id(child_data))
                         results.append(child_data)
             else:
-                if data not in results:
+                if id(data) not in seen_ids:
+                    seen_ids.add(id(data))
                     results.append(data)
     
     # 如果精確匹配成功，直接返回，不再進行 fallback 匹配
     if results:
-        return results
-    
+        return tuple(results)
+
     # 第二步：特殊關鍵詞匹配（包含「龍頭」）
     if "龍頭" in lookup:
-        tap_data = catalog.get("龍頭")
+        tap_data = _PRODUCT_CATALOG.get("龍頭")
         if tap_data:
-            return [tap_data]
+            return (tap_data,)
     
     # 第三步：fallback - 用物料名稱包含關係匹配（含空白/破折號/大小寫）
-    normalized_lookup = lookup.replace(" ", "").replace("-", "")
-    for key, data in catalog.items():
-        # 跳過有 children 的父項
-        if data.get("children"):
-            continue
-        name_upper = (data.get("name") or "").upper()
-        name_norm = name_upper.replace(" ", "").replace("-", "")
-        if normalized_lookup and (normalized_lookup in name_norm or name_norm in normalized_lookup):
-            if data not in results:
-                results.append(data)
-    
-    return results
+    normalized_lookup = lookup.translate(_PLAN_NORMALIZE_TABLE)
+    if normalized_lookup:
+        for name_norm, data in _FALLBACK_INDEX:
+            if normalized_lookup in name_norm or name_norm in normalized_lookup:
+                if id(data) not in seen_ids:
+                    seen_ids.add(id(data))
+                    results.append(data)
+
+    return tuple(results)
 
 
 def _lookup_product_single(key: str) -> Dict[str, str]:
@@ -1677,49 +1808,51 @@ def _lookup_product_single(key: str) -> Dict[str, str]:
     return results[0] if results else {}
 
 
+# 安裝內容斷詞／數量解析用，預先編譯避免每個 token 走 re 快取查找
+_TOKEN_SPLIT_RE = re.compile(r"[+,，；;]")
+_QTY_RE = re.compile(r"\*(\d+)")
+
+
 def _parse_install_items(text: str, plan_type: str) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     if not text:
         return items
-    tokens = [t.strip() for t in re.split(r"[+,，；;]", text) if t.strip()]
+    tokens = [t.strip() for t in _TOKEN_SPLIT_RE.split(text) if t.strip()]
+    # 去重：同 code+name+cycle+qty 只保留一筆；累加時即過濾，省掉二次掃描
+    seen = set()
     for token in tokens:
         qty = 1
-        qty_match = re.search(r"\*(\d+)", token)
+        qty_match = _QTY_RE.search(token)
         if qty_match:
             try:
                 qty = int(qty_match.group(1))
             except ValueError:
                 qty = 1
-        name = re.sub(r"\*\d+", "", token).strip()
+        name = _QTY_RE.sub("", token).strip()
         mapped_list = _lookup_products(name)
         if not mapped_list:
             # 未在物料表命中時跳過，避免產生空白行項
             continue
         for mapped in mapped_list:
             cycle = _normalize_cycle(mapped.get("cycle"))
+            item_name = mapped.get("name") or name
+            key = (
+                (mapped.get("code") or "").strip(),
+                (item_name or "").strip(),
+                str(cycle or ""),
+                str(qty or "1"),
+            )
+            if key in seen:
+                continue
+            seen.add(key)
             items.append(
                 {
-                    "name": mapped.get("name") or name,
+                    "name": item_name,
                     "code": mapped.get("code"),
                     "cycle": cycle,
                     "qty": qty,
                 }
             )
-    # 去重：同 code+name+cycle+qty 只保留一筆
-    deduped: List[Dict[str, Any]] = []
-    seen = set()
-    for it in items:
-        key = (
-            (it.get("code") or "").strip(),
-            (it.get("name") or "").strip(),
-            str(it.get("cycle") or ""),
-            str(it.get("qty") or "1"),
-        )
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append(it)
-    return deduped
     return items
 
 
@@ -1733,21 +1866,128 @@ def _normalize_cycle(value: Optional[str]) -> Optional[int]:
         return None
 
 
+def _is_empty(value: Any) -> bool:
+    # 最常見的 None 先短路，免去 4 元素 tuple 成員比較
+    return value is None or value == "" or (isinstance(value, (list, dict)) and not value)
+
+
 def _cleanup(obj: Any) -> Any:
     if isinstance(obj, dict):
-        return {k: _cleanup(v) for k, v in obj.items() if v not in (None, "", [], {})}
+        return {k: _cleanup(v) for k, v in obj.items() if not _is_empty(v)}
     if isinstance(obj, list):
-        return [_cleanup(item) for item in obj if item not in (None, "", [], {})]
+        return [_cleanup(item) for item in obj if not _is_empty(item)]
     return obj
 
 
+# CRM 回應成功碼；凍結常量避免每次檢查重建 set 字面值
+_SUCCESS_CODES = frozenset(("200", "00000"))
+
+
 def _is_success_response(response: Optional[Dict[str, Any]]) -> bool:
     if not isinstance(response, dict):
         return False
     code = response.get("code")
     if code is None:
         return False
-    return str(code) in {"200", "00000"}
+    return str(code) in _SUCCESS_CODES
+
+
+def _code_stamp(now: Optional[datetime] = None) -> str:
+    """以 f-string 組 YYYYMMDDHHMMSS；跳過 strftime 的格式字串機制。"""
+    now = now or datetime.now()
+    return (
+        f"{now.year:04}{now.month:02}{now.day:02}"
+        f"{now.hour:02}{now.minute:02}{now.second:02}"
+    )
+
+
+# 各任務類型的固定欄位骨架（交易/業務類型 ID 與固定摘要）。
+# 建 payload 時複製骨架再補動態欄位，省掉每筆任務逐鍵評估 25 鍵字面值
+_NEW_TASK_TEMPLATE: Dict[str, Any] = {
+    "taskTransType": "1984155894542237704",  # 新增項目
+    "taskTransType_actionTransType": "1597134252596527112",
+    "taskTransType_actionTransTypeBustype": "1597128428638699526",
+    "bustype": "1984154580281720833",
+    "summary": "",
+    "_status": "Insert",
+}
+
+_QFEE_TASK_TEMPLATE: Dict[str, Any] = {
+    "taskTransType": "1705112066885419012",  # 定期月費
+    "taskTransType_actionTransType": "1597134252596527112",
+    "taskTransType_actionTransTypeBustype": "1597128428638699526",
+    "bustype": "1700013665820344329",
+    "summary": "（季度收費）",
+    "_status": "Insert",
+}
+
+_FILTER_TASK_TEMPLATE: Dict[str, Any] = {
+    "taskTransType": "1587879680409075716",  # 更換濾芯
+    "taskTransType_actionTransType": "1587879199387942917",
+    "taskTransType_actionTransTypeBustype": "1587877885106454533",
+    "bustype": "1587876974596980738",
+    "summary": "",
+    "_status": "Insert",
+}
+
+_RENEW_TASK_TEMPLATE: Dict[str, Any] = {
+    "taskTransType": "1984155413509046278",  # 續約換芯
+    "taskTransType_actionTransType": "1587879199387942917",
+    "taskTransType_actionTransTypeBustype": "1587877885106454533",
+    "bustype": "1984154477184679941",
+    "summary": "",
+    "_status": "Insert",
+}
+
+
+# 執行人固定欄位；各任務只有人員組合與起迄時間不同
+_EXECUTOR_TEMPLATE: Dict[str, Any] = {
+    "executeStatus": "0",
+    "reformStatus": "0",
+    "acceptStatus": "0",
+    "isUnlock": "0",
+    "_status": "Insert",
+}
+
+_EXEC_CS003 = ("1482551268133044232", "客服003")
+_EXEC_WXB005 = ("1655434173036888070", "維修幫005")
+_EXEC_CN008 = ("1634618416471998473", "出納008")
+
+# 更換濾芯 / 續約換芯任務只差模板、編碼前綴與執行人，差異集中在這張設定表
+_TASK_KIND_CONFIG: Dict[str, Dict[str, Any]] = {
+    "flt": {
+        "template": _FILTER_TASK_TEMPLATE,
+        "code_prefix": "TASKFLT",
+        "executors": (_EXEC_CS003, _EXEC_WXB005),
+    },
+    "ren": {
+        "template": _RENEW_TASK_TEMPLATE,
+        "code_prefix": "TASKREN",
+        "executors": (_EXEC_CS003, _EXEC_WXB005, _EXEC_CN008),
+    },
+}
+
+# 提醒規則固定只有一條且從不改動；各 payload 以 list(_REMIND_RULE) 取新列表、共用內層 dict
+_REMIND_RULE: Tuple[Dict[str, str], ...] = (
+    {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"},
+)
+
+
+def _build_executors(
+    members: Tuple[Tuple[str, str], ...], start_ts: str, end_ts: str
+) -> List[Dict[str, Any]]:
+    return [
+        {
+            **_EXECUTOR_TEMPLATE,
+            "executor": executor_id,
+            "executor_name": executor_name,
+            "startDate": start_ts,
+            "endDate": end_ts,
+            # 可變欄位每人換新份，避免共用
+            "excutorDefineCharacter": {},
+        }
+        for executor_id, executor_name in members
+    ]
 
 
 def _auto_create_tasks_for_opportunity(
@@ -1757,42 +1997,40 @@ def _auto_create_tasks_for_opportunity(
     client: CRMClient,
 ) -> None:
     owner_id, owner_name = _task_owner(settings)
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
     data = create_response.get("data") or {}
-    
-    # 調試日誌：打印 context 和 data 的關鍵信息
-    print(f"[task] Debug - context keys: {list(context.keys())}", flush=True)
-    print(f"[task] Debug - context.customerId: {context.get('customerId')}", flush=True)
-    print(f"[task] Debug - context.customerName: {context.get('customerName')}", flush=True)
-    print(f"[task] Debug - context.customerCode: {context.get('customerCode')}", flush=True)
-    print(f"[task] Debug - data keys: {list(data.keys())}", flush=True)
-    print(f"[task] Debug - data.customer: {data.get('customer')}", flush=True)
-    print(f"[task] Debug - data.customer_name: {data.get('customer_name')}", flush=True)
-    
+
+    # 調試日誌：%s 延遲格式化，未開 DEBUG 時不組字串也不刷 stdout
+    logger.debug("[task] context keys: %s", list(context.keys()))
+    logger.debug("[task] context.customerId: %s", context.get("customerId"))
+    logger.debug("[task] context.customerName: %s", context.get("customerName"))
+    logger.debug("[task] context.customerCode: %s", context.get("customerCode"))
+    logger.debug("[task] data keys: %s", list(data.keys()))
+    logger.debug("[task] data.customer: %s", data.get("customer"))
+    logger.debug("[task] data.customer_name: %s", data.get("customer_name"))
+
     oppt_id = data.get("id") or context.get("opptId")
     oppt_stage = data.get("opptStage") or context.get("opptStage")
     customer_id = context.get("customerId") or data.get("customer")
     customer_name = context.get("customerName") or data.get("customer_name")
-    
-    print(f"[task] Debug - final customer_id: {customer_id}", flush=True)
-    print(f"[task] Debug - final customer_name: {customer_name}", flush=True)
-    
+
+    logger.debug("[task] final customer_id: %s", customer_id)
+    logger.debug("[task] final customer_name: %s", customer_name)
+
     # 驗證客戶ID
     if not customer_id:
         # 嘗試通過客戶編碼查詢
         customer_code = context.get("customerCode")
         if customer_code:
-            print(f"[task] 嘗試通過客戶編碼 {customer_code} 查詢客戶ID", flush=True)
+            logger.info("[task] 嘗試通過客戶編碼 %s 查詢客戶ID", customer_code)
             try:
                 customer_id = _lookup_customer_id_by_code(customer_code, client)
                 if customer_id:
-                    print(f"[task] ✅ 查詢到客戶ID: {customer_id}", flush=True)
+                    logger.info("[task] 查詢到客戶ID: %s", customer_id)
                 else:
-                    print(f"[task] ❌ 無法查詢到客戶ID", flush=True)
+                    logger.warning("[task] 無法查詢到客戶ID")
             except Exception as e:
-                print(f"[task] ❌ 查詢客戶ID失敗: {e}", flush=True)
-        
+                logger.warning("[task] 查詢客戶ID失敗: %s", e)
+
         if not customer_id:
             error_msg = (
                 f"無法創建任務：缺少客戶ID。"
@@ -1801,12 +2039,12 @@ def _auto_create_tasks_for_opportunity(
                 f"data.customer={data.get('customer')}, "
                 f"context keys={list(context.keys())}"
             )
-            print(f"[task] ❌ ERROR: {error_msg}", flush=True)
+            logger.error("[task] %s", error_msg)
             raise ValueError(error_msg)
-    
+
     if not customer_name:
         customer_name = context.get("customerCode") or f"客戶_{customer_id}"
-        print(f"[task] Warning: 使用後備客戶名稱: {customer_name}", flush=True)
+        logger.warning("[task] 使用後備客戶名稱: %s", customer_name)
     sale_area = context.get("saleAreaId") or data.get("saleArea")
     dept_id = settings.service_dept_id
     dept_name = settings.service_dept_name
@@ -1815,29 +2053,18 @@ def _auto_create_tasks_for_opportunity(
     raw_install = context.get("installTime")
     parsed_install = parse_install_time(raw_install) if raw_install else None
     if parsed_install:
-        start_date = parsed_install["display"].split(" ")[0]
+        start_date = parsed_install["display"].partition(" ")[0]
     if not start_date:
         raw_date = (
             str(context.get("opportunityDate") or "")
             or str(context.get("expectSignDate") or "")
         )
         if raw_date:
-            start_date = str(raw_date).split(" ")[0]
+            start_date = str(raw_date).partition(" ")[0]
     if not start_date:
         start_date = datetime.now().strftime("%Y-%m-%d")
     end_date = start_date
 
-    # 任務類型：新增項目
-    task_type_id = "1984155894542237704"  # 新增項目
-    task_bustype_id = "1984154580281720833"
-    task_action_trans_type = "1597134252596527112"
-    task_action_bustype = "1597128428638699526"
-
-    executors = [
-        {"id": "1655434173036888070", "name": "維修幫005"},
-        {"id": "1634618416471998473", "name": "出納008"},
-    ]
-
     summary = ""
     raw_text = (context.get("rawText") or "").strip()
     if raw_text:
@@ -1850,29 +2077,29 @@ def _auto_create_tasks_for_opportunity(
             f"內容：{context.get('remark') or ''}",
         ]
         content = "\n".join([p for p in content_parts if p and p.strip(': ')])
-    task_code = datetime.now().strftime("%Y%m%d%H%M%S") + uuid4().hex[:4]
-
-    payload = {
-        "data": {
+    task_code = _code_stamp() + uuid4().hex[:4]
+
+    # 起訖時間字串各組一次，payload 與 executor 清單共用同一物件
+    start_ts = f"{start_date} 00:00:00"
+    end_ts = f"{end_date} 23:59:59"
+    payload_data = _NEW_TASK_TEMPLATE.copy()
+    payload_data.update(
+        {
             "code": task_code,
             "resubmitCheckKey": _short_resubmit("task"),
             "org": settings.sales_org_id,
             "org_name": "",
-            "taskTransType": task_type_id,
-            "taskTransType_actionTransType": task_action_trans_type,
-            "taskTransType_actionTransTypeBustype": task_action_bustype,
-            "bustype": task_bustype_id,
-            "startDate": f"{start_date} 00:00:00",
-            "endDate": f"{end_date} 23:59:59",
+            "startDate": start_ts,
+            "endDate": end_ts,
             "customer": customer_id,
             "customer_name": customer_name,
             "originator": owner_id,
             "originator_name": owner_name,
             "saleArea": sale_area,
-        "dept": dept_id,
-        "dept_name": dept_name,
-        "summary": summary,
-        "content": content,
+            "dept": dept_id,
+            "dept_name": dept_name,
+            "summary": summary,
+            "content": content,
             "oppt": oppt_id,
             "opptStage": oppt_stage,
             "ower": owner_id,
@@ -1881,43 +2108,39 @@ def _auto_create_tasks_for_opportunity(
             # 更換濾芯任務不寫金額
             "taskDefineCharacter": {},
             "taskExecutorList": [],
-            "taskRemindRuleList": [
-                {
-                    "remindPoint": "0",
-                    "advanceTime": "0",
-                    "timeUnit": "0",
-                    "_status": "Insert",
-                }
-            ],
-            "_status": "Insert",
+            "taskRemindRuleList": list(_REMIND_RULE),
         }
-    }
-    # 更換濾芯任務不寫金額
-
-    for ex in executors:
-        payload["data"]["taskExecutorList"].append(
-            {
-                "executor": ex["id"],
-                "executor_name": ex["name"],
-                "executeStatus": "0",
-                "reformStatus": "0",
-                "acceptStatus": "0",
-                "isUnlock": "0",
-                "startDate": f"{start_date} 00:00:00",
-                "endDate": f"{end_date} 23:59:59",
-                "excutorDefineCharacter": {},
-                "_status": "Insert",
-            }
-        )
+    )
+    payload_data["taskExecutorList"] = _build_executors(
+        (_EXEC_WXB005, _EXEC_CN008), start_ts, end_ts
+    )
+    payload = {"data": payload_data}
 
-    log_line = json.dumps(payload, ensure_ascii=False)
-    print(f"[task] payload {log_line}", flush=True)
+    # 只有 DEBUG 開啟時才做 JSON 序列化，避免每個任務多走一次完整編碼
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] payload %s", _dumps(payload))
     resp = client.create_task(payload)
-    print(f"[task] response {json.dumps(resp, ensure_ascii=False)}", flush=True)
-    if str(resp.get("code")) not in {"200", "00000"}:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] response %s", _dumps(resp))
+    if str(resp.get("code")) not in _SUCCESS_CODES:
         raise RuntimeError(f"task save failed: {resp}")
 
 
+def _fast_ymd(value: Any) -> Optional[date]:
+    """解析 YYYY-MM-DD：固定格式走切片轉 int，比 strptime 的泛用解析快一個量級。"""
+    text = str(value).partition(" ")[0]
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return date(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+        except ValueError:
+            return None
+    # 非標準寫法（如未補零）才退回 strptime
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except Exception:
+        return None
+
+
 def _find_next_replacement_date(create_data: Dict[str, Any]) -> Optional[Tuple[date, str]]:
     items = create_data.get("opptItemList") or []
     candidates: List[Tuple[date, str]] = []
@@ -1933,33 +2156,27 @@ def _find_next_replacement_date(create_data: Dict[str, Any]) -> Optional[Tuple[d
         )
         define3 = body.get("define3")
         if define3:
-            try:
-                candidates.append(
-                    (datetime.strptime(str(define3).split(" ")[0], "%Y-%m-%d").date(), prod_name)
-                )
+            parsed = _fast_ymd(define3)
+            if parsed:
+                candidates.append((parsed, prod_name))
                 continue
-            except Exception:
-                pass
         def_char = item.get("opptItemDefineCharacter") or {}
         att13 = def_char.get("attrext13")
         if att13:
-            try:
-                candidates.append(
-                    (datetime.strptime(str(att13).split(" ")[0], "%Y-%m-%d").date(), prod_name)
-                )
+            parsed = _fast_ymd(att13)
+            if parsed:
+                candidates.append((parsed, prod_name))
                 continue
-            except Exception:
-                pass
         # 若有週期，嘗試用 define1 + define2 生成
         define1 = body.get("define1")
         cycle = body.get("define2")
         if define1 and cycle:
-            try:
-                base = datetime.strptime(str(define1).split(" ")[0], "%Y-%m-%d").date()
-                months = int(cycle)
-                candidates.append((_add_months(base, months), prod_name))
-            except Exception:
-                pass
+            base = _fast_ymd(define1)
+            if base:
+                try:
+                    candidates.append((_add_months(base, int(cycle)), prod_name))
+                except Exception:
+                    pass
     if not candidates:
         return None
     today = date.today()
@@ -1972,18 +2189,10 @@ def _find_next_replacement_date(create_data: Dict[str, Any]) -> Optional[Tuple[d
 def _add_months(d: date, months: int) -> date:
     year = d.year + (d.month - 1 + months) // 12
     month = (d.month - 1 + months) % 12 + 1
-    day = min(d.day, _days_in_month(year, month))
+    day = min(d.day, calendar.monthrange(year, month)[1])
     return date(year, month, day)
 
 
-def _days_in_month(year: int, month: int) -> int:
-    if month == 12:
-        next_month = date(year + 1, 1, 1)
-    else:
-        next_month = date(year, month + 1, 1)
-    return (next_month - timedelta(days=1)).day
-
-
 def _create_filter_change_task(
     context: Dict[str, Any],
     settings: SubmissionSettings,
@@ -2003,7 +2212,7 @@ def _create_filter_change_task(
     start_date = next_date - timedelta(days=14)
     start_s = start_date.strftime("%Y-%m-%d")
     end_s = start_s
-    task_code = "FLT" + datetime.now().strftime("%Y%m%d%H%M%S") + uuid4().hex[:4]
+    task_code = "FLT" + _code_stamp() + uuid4().hex[:4]
     # 任務內容：優先顯示「更換濾芯」或物料名；若物料名是純數字則寫「更換濾芯」
     content = product_name or "更換濾芯"
     try:
@@ -2011,17 +2220,16 @@ def _create_filter_change_task(
             content = "更換濾芯"
     except Exception:
         pass
-    payload = {
-        "data": {
+    start_ts = f"{start_s} 00:00:00"
+    end_ts = f"{end_s} 23:59:59"
+    payload_data = _FILTER_TASK_TEMPLATE.copy()
+    payload_data.update(
+        {
             "code": task_code,
             "resubmitCheckKey": _short_resubmit("task"),
             "org": settings.sales_org_id,
-            "taskTransType": "1587879680409075716",  # 更換濾芯
-            "taskTransType_actionTransType": "1587879199387942917",
-            "taskTransType_actionTransTypeBustype": "1587877885106454533",
-            "bustype": "1587876974596980738",
-            "startDate": f"{start_s} 00:00:00",
-            "endDate": f"{end_s} 23:59:59",
+            "startDate": start_ts,
+            "endDate": end_ts,
             "customer": customer_id,
             "customer_name": customer_name,
             "originator": owner_id,
@@ -2029,7 +2237,6 @@ def _create_filter_change_task(
             "saleArea": sale_area,
             "dept": dept_id,
             "dept_name": dept_name,
-            "summary": "",
             "content": content,
             "oppt": oppt_id,
             "opptStage": oppt_stage,
@@ -2039,36 +2246,20 @@ def _create_filter_change_task(
             # 更換濾芯任務不寫金額
             "taskDefineCharacter": {},
             "taskExecutorList": [],
-            "taskRemindRuleList": [
-                {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-            ],
-            "_status": "Insert",
+            "taskRemindRuleList": list(_REMIND_RULE),
         }
-    }
-    # 更換濾芯任務不寫金額
+    )
     # 執行人：003 + 005
-    for ex in (
-        {"id": "1482551268133044232", "name": "客服003"},
-        {"id": "1655434173036888070", "name": "維修幫005"},
-    ):
-        payload["data"]["taskExecutorList"].append(
-            {
-                "executor": ex["id"],
-                "executor_name": ex["name"],
-                "executeStatus": "0",
-                "reformStatus": "0",
-                "acceptStatus": "0",
-                "isUnlock": "0",
-                "startDate": f"{start_s} 00:00:00",
-                "endDate": f"{end_s} 23:59:59",
-                "excutorDefineCharacter": {},
-                "_status": "Insert",
-            }
-        )
-    print(f"[task] payload {json.dumps(payload, ensure_ascii=False)}", flush=True)
+    payload_data["taskExecutorList"] = _build_executors(
+        (_EXEC_CS003, _EXEC_WXB005), start_ts, end_ts
+    )
+    payload = {"data": payload_data}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] payload %s", _dumps(payload))
     resp = client.create_task(payload)
-    print(f"[task] response {json.dumps(resp, ensure_ascii=False)}", flush=True)
-    if str(resp.get("code")) not in {"200", "00000"}:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] response %s", _dumps(resp))
+    if str(resp.get("code")) not in _SUCCESS_CODES:
         raise RuntimeError(f"task save failed: {resp}")
 
 
@@ -2095,26 +2286,24 @@ def _create_renew_task(
     )
     if not raw_end:
         return
-    try:
-        end_date_obj = datetime.strptime(str(raw_end).split(" ")[0], "%Y-%m-%d").date()
-    except Exception:
+    end_date_obj = _fast_ymd(raw_end)
+    if end_date_obj is None:
         return
     start_date = end_date_obj - timedelta(days=14)
     start_s = start_date.strftime("%Y-%m-%d")
-    task_code = "TREN" + datetime.now().strftime("%Y%m%d%H%M%S") + uuid4().hex[:4]
+    task_code = "TREN" + _code_stamp() + uuid4().hex[:4]
     # 任務內容固定寫「續約」，不帶原文
     content = "續約"
-    payload = {
-        "data": {
+    start_ts = f"{start_s} 00:00:00"
+    end_ts = f"{start_s} 23:59:59"
+    payload_data = _RENEW_TASK_TEMPLATE.copy()
+    payload_data.update(
+        {
             "code": task_code,
-        "resubmitCheckKey": _short_resubmit("task"),
+            "resubmitCheckKey": _short_resubmit("task"),
             "org": settings.sales_org_id,
-            "taskTransType": "1984155413509046278",  # 續約換芯
-            "taskTransType_actionTransType": "1587879199387942917",
-            "taskTransType_actionTransTypeBustype": "1587877885106454533",
-            "bustype": "1984154477184679941",
-            "startDate": f"{start_s} 00:00:00",
-            "endDate": f"{start_s} 23:59:59",
+            "startDate": start_ts,
+            "endDate": end_ts,
             "customer": customer_id,
             "customer_name": customer_name,
             "originator": owner_id,
@@ -2122,50 +2311,34 @@ def _create_renew_task(
             "saleArea": sale_area,
             "dept": dept_id,
             "dept_name": dept_name,
-            "summary": "",
             "content": content,
             "oppt": oppt_id,
             "opptStage": oppt_stage,
             "ower": owner_id,
             "ower_name": owner_name,
             "systemSource": settings.system_source,
+            # 續約換芯任務不寫金額
             "taskDefineCharacter": {},
             "taskExecutorList": [],
-            "taskRemindRuleList": [
-                {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-            ],
-            "_status": "Insert",
+            "taskRemindRuleList": list(_REMIND_RULE),
         }
-    }
-    # 續約換芯任務不寫金額
+    )
     # 執行人：003 + 005
-    for ex in (
-        {"id": "1482551268133044232", "name": "客服003"},
-        {"id": "1655434173036888070", "name": "維修幫005"},
-    ):
-        payload["data"]["taskExecutorList"].append(
-            {
-                "executor": ex["id"],
-                "executor_name": ex["name"],
-                "executeStatus": "0",
-                "reformStatus": "0",
-                "acceptStatus": "0",
-                "isUnlock": "0",
-                "startDate": f"{start_s} 00:00:00",
-                "endDate": f"{start_s} 23:59:59",
-                "excutorDefineCharacter": {},
-                "_status": "Insert",
-            }
-        )
-    print(f"[task] payload {json.dumps(payload, ensure_ascii=False)}", flush=True)
+    payload_data["taskExecutorList"] = _build_executors(
+        (_EXEC_CS003, _EXEC_WXB005), start_ts, end_ts
+    )
+    payload = {"data": payload_data}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] payload %s", _dumps(payload))
     resp = client.create_task(payload)
-    print(f"[task] response {json.dumps(resp, ensure_ascii=False)}", flush=True)
-    if str(resp.get("code")) not in {"200", "00000"}:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[task] response %s", _dumps(resp))
+    if str(resp.get("code")) not in _SUCCESS_CODES:
         raise RuntimeError(f"task save failed: {resp}")
 
 
 def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
-    settings = SubmissionSettings()
+    settings = get_settings()
     owner_id, owner_name = _task_owner(settings)
     client = CRMClient()
     opp_resp = client.get_opportunities(customer_code, page_size=1)
@@ -2208,7 +2381,7 @@ def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
     install_date = None
     if contract_start:
         try:
-            install_date = str(contract_start).split(" ")[0]
+            install_date = str(contract_start).partition(" ")[0]
         except Exception:
             install_date = None
     if not install_date:
@@ -2233,7 +2406,8 @@ def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
         remark_text = latest.get("remark") or data.get("remark") or ""
         if remark_text:
             content_parts.append(f"備注：{remark_text}")
-        content_full = "\n".join([p for p in content_parts if p and str(p).strip().strip(':')])
+        # 每行都帶全形「：」標籤，舊的 strip(':') 過濾不可能刪掉任何行，直接 join
+        content_full = "\n".join(content_parts)
     results = []
 
     def _do_create(code_prefix: str, payload: Dict[str, Any]) -> None:
@@ -2243,104 +2417,34 @@ def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
     def _parse_date_only(value: Optional[str]) -> Optional[date]:
         if not value:
             return None
-        text = str(value).strip().split(" ")[0]
-        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d"):
+        text = str(value).strip().partition(" ")[0]
+        # ISO 形式走快速路徑（內含 %Y-%m-%d 的 strptime 後備）
+        parsed = _fast_ymd(text)
+        if parsed:
+            return parsed
+        for fmt in ("%Y/%m/%d", "%Y.%m.%d"):
             try:
                 return datetime.strptime(text, fmt).date()
             except Exception:
                 continue
         return None
 
-    def _add_months(dt: date, months: int) -> date:
-        month = dt.month - 1 + months
-        year = dt.year + month // 12
-        month = month % 12 + 1
-        last_day = calendar.monthrange(year, month)[1]
-        day = min(dt.day, last_day)
-        return date(year, month, day)
+    # 同批任務共用一個時間戳，不必每個編碼各格式化一次
+    stamp = _code_stamp()
 
-    # 任務1：新增項目（執行人 005+008）
-    task_code_new = "TASKNEW" + datetime.now().strftime("%Y%m%d%H%M%S")
-    new_payload = {
-        "code": task_code_new,
-        "resubmitCheckKey": _short_resubmit("task"),
-        "org": settings.sales_org_id,
-        "taskTransType": "1984155894542237704",
-        "taskTransType_actionTransType": "1597134252596527112",
-        "taskTransType_actionTransTypeBustype": "1597128428638699526",
-        "bustype": "1984154580281720833",
-        "startDate": f"{install_date} 00:00:00",
-        "endDate": f"{install_date} 23:59:59",
-        "customer": customer_id,
-        "customer_name": customer_name,
-        "originator": owner_id,
-        "originator_name": owner_name,
-        "saleArea": sale_area,
-        "dept": settings.service_dept_id,
-        "dept_name": settings.service_dept_name,
-        "summary": "",
-        "content": content_full,
-        "oppt": oppt_id,
-        "opptStage": opp_stage,
-        "ower": owner_id,
-        "ower_name": owner_name,
-        "systemSource": settings.system_source,
-        "taskDefineCharacter": {"RW01": amount} if amount else {},
-        "taskExecutorList": [],
-        "taskRemindRuleList": [
-            {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-        ],
-        "_status": "Insert",
-    }
-    for ex in (
-        {"id": "1655434173036888070", "name": "維修幫005"},
-        {"id": "1634618416471998473", "name": "出納008"},
-    ):
-        new_payload["taskExecutorList"].append(
+    def _build_dated_task(kind: str, date_s: str, content: str) -> Dict[str, Any]:
+        """依 _TASK_KIND_CONFIG 組 flt/ren 任務 payload，共用欄位只寫一份。"""
+        cfg = _TASK_KIND_CONFIG[kind]
+        start_ts = f"{date_s} 00:00:00"
+        end_ts = f"{date_s} 23:59:59"
+        payload = cfg["template"].copy()
+        payload.update(
             {
-                "executor": ex["id"],
-                "executor_name": ex["name"],
-                "executeStatus": "0",
-                "reformStatus": "0",
-                "acceptStatus": "0",
-                "isUnlock": "0",
-                "startDate": f"{install_date} 00:00:00",
-                "endDate": f"{install_date} 23:59:59",
-                "excutorDefineCharacter": {},
-                "_status": "Insert",
-            }
-        )
-    _do_create("new", new_payload)
-
-    # 任務：季度收費定期月費（僅付款方式=季度收費時觸發）
-    contract_start_date = _parse_date_only(contract_start)
-    contract_end_date = _parse_date_only(contract_end)
-    is_quarterly = payment_label == "季度收費" or payment_code in {"04", "4", "004"}
-    if is_quarterly and contract_start_date and contract_end_date:
-        first_date = _add_months(contract_start_date, 3)
-        last_date = _add_months(contract_end_date, -3)
-        amount_quarter = None
-        try:
-            if monthly_fee is not None:
-                amount_quarter = float(monthly_fee) * 3
-        except Exception:
-            amount_quarter = None
-
-        current = first_date
-        while current <= last_date:
-            next_period_end = _add_months(current, 3)
-            task_code_q = "TASKQFEE" + datetime.now().strftime("%Y%m%d%H%M%S") + uuid4().hex[:2]
-            qfee_payload = {
-                "code": task_code_q,
+                "code": cfg["code_prefix"] + stamp,
                 "resubmitCheckKey": _short_resubmit("task"),
                 "org": settings.sales_org_id,
-                # 定期月費任務：使用 CRM 既有的「定期月費」類型
-                "taskTransType": "1705112066885419012",
-                "taskTransType_actionTransType": "1597134252596527112",
-                "taskTransType_actionTransTypeBustype": "1597128428638699526",
-                "bustype": "1700013665820344329",
-                "startDate": f"{current} 00:00:00",
-                "endDate": f"{current} 23:59:59",
+                "startDate": start_ts,
+                "endDate": end_ts,
                 "customer": customer_id,
                 "customer_name": customer_name,
                 "originator": owner_id,
@@ -2348,55 +2452,33 @@ def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
                 "saleArea": sale_area,
                 "dept": settings.service_dept_id,
                 "dept_name": settings.service_dept_name,
-                "summary": "（季度收費）",
-                "content": f"{current} — {next_period_end}",
+                "content": content,
                 "oppt": oppt_id,
                 "opptStage": opp_stage,
                 "ower": owner_id,
                 "ower_name": owner_name,
                 "systemSource": settings.system_source,
-                "taskDefineCharacter": {"RW01": amount_quarter} if amount_quarter is not None else {},
-                "taskExecutorList": [],
-                "taskRemindRuleList": [
-                    {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-                ],
-                "_status": "Insert",
+                "taskDefineCharacter": {},
+                "taskExecutorList": _build_executors(
+                    cfg["executors"], start_ts, end_ts
+                ),
+                "taskRemindRuleList": list(_REMIND_RULE),
             }
-            # 執行人只寫 008
-            qfee_payload["taskExecutorList"].append(
-                {
-                    "executor": "1634618416471998473",
-                    "executor_name": "出納008",
-                    "executeStatus": "0",
-                    "reformStatus": "0",
-                    "acceptStatus": "0",
-                    "isUnlock": "0",
-                    "startDate": f"{current} 00:00:00",
-                    "endDate": f"{current} 23:59:59",
-                    "excutorDefineCharacter": {},
-                    "_status": "Insert",
-                }
-            )
-            _do_create("qfee", qfee_payload)
-            current = _add_months(current, 3)
+        )
+        return payload
 
-    # 任務2：更換濾芯（最近下次換芯日 -14，內容用物料名；執行人 003+005）
-    next_info = _find_next_replacement_date(data)
-    if next_info:
-        next_date, prod_name = next_info
-        start_date2 = next_date - timedelta(days=14)
-        start_s = start_date2.strftime("%Y-%m-%d")
-        task_code_flt = "TASKFLT" + datetime.now().strftime("%Y%m%d%H%M%S")
-        flt_payload = {
-            "code": task_code_flt,
+    # 任務1：新增項目（執行人 005+008）
+    task_code_new = "TASKNEW" + stamp
+    install_start_ts = f"{install_date} 00:00:00"
+    install_end_ts = f"{install_date} 23:59:59"
+    new_payload = _NEW_TASK_TEMPLATE.copy()
+    new_payload.update(
+        {
+            "code": task_code_new,
             "resubmitCheckKey": _short_resubmit("task"),
             "org": settings.sales_org_id,
-            "taskTransType": "1587879680409075716",
-            "taskTransType_actionTransType": "1587879199387942917",
-            "taskTransType_actionTransTypeBustype": "1587877885106454533",
-            "bustype": "1587876974596980738",
-            "startDate": f"{start_s} 00:00:00",
-            "endDate": f"{start_s} 23:59:59",
+            "startDate": install_start_ts,
+            "endDate": install_end_ts,
             "customer": customer_id,
             "customer_name": customer_name,
             "originator": owner_id,
@@ -2404,107 +2486,157 @@ def create_tasks_for_customer_code(customer_code: str) -> Dict[str, Any]:
             "saleArea": sale_area,
             "dept": settings.service_dept_id,
             "dept_name": settings.service_dept_name,
-            "summary": "",
-            # 任務內容：使用匹配到的物料全名；若缺失則寫更換濾芯
-            "content": prod_name or "更換濾芯",
+            "content": content_full,
             "oppt": oppt_id,
             "opptStage": opp_stage,
             "ower": owner_id,
             "ower_name": owner_name,
             "systemSource": settings.system_source,
-            "taskDefineCharacter": {},
+            "taskDefineCharacter": {"RW01": amount} if amount else {},
             "taskExecutorList": [],
-            "taskRemindRuleList": [
-                {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-            ],
-            "_status": "Insert",
+            "taskRemindRuleList": list(_REMIND_RULE),
         }
-        for ex in (
-            {"id": "1482551268133044232", "name": "客服003"},
-            {"id": "1655434173036888070", "name": "維修幫005"},
-        ):
-            flt_payload["taskExecutorList"].append(
+    )
+    new_payload["taskExecutorList"] = _build_executors(
+        (_EXEC_WXB005, _EXEC_CN008), install_start_ts, install_end_ts
+    )
+    _do_create("new", new_payload)
+
+    # 任務：季度收費定期月費（僅付款方式=季度收費時觸發）
+    contract_start_date = _parse_date_only(contract_start)
+    contract_end_date = _parse_date_only(contract_end)
+    is_quarterly = payment_label == "季度收費" or payment_code in {"04", "4", "004"}
+    if is_quarterly and contract_start_date and contract_end_date:
+        first_date = _add_months(contract_start_date, 3)
+        last_date = _add_months(contract_end_date, -3)
+        amount_quarter = None
+        try:
+            if monthly_fee is not None:
+                amount_quarter = float(monthly_fee) * 3
+        except Exception:
+            amount_quarter = None
+
+        # 迴圈不變量綁成 local：多年期合約一季一筆，省掉每輪的屬性鏈查找
+        org_id = settings.sales_org_id
+        dept_id = settings.service_dept_id
+        dept_name = settings.service_dept_name
+        system_source = settings.system_source
+
+        # 任務編碼：一批只取一次時間戳與亂數（uuid4 每次都讀 urandom），
+        # 迴圈內用序號保持唯一
+        batch_stamp = stamp
+        batch_suffix = uuid4().hex[:2]
+        seq = 0
+
+        qfee_payloads: List[Dict[str, Any]] = []
+        current = first_date
+        while current <= last_date:
+            next_period_end = _add_months(current, 3)
+            task_code_q = f"TASKQFEE{batch_stamp}{batch_suffix}{seq:02x}"
+            seq += 1
+            q_start_ts = f"{current} 00:00:00"
+            q_end_ts = f"{current} 23:59:59"
+            # 定期月費任務：使用 CRM 既有的「定期月費」類型骨架
+            qfee_payload = _QFEE_TASK_TEMPLATE.copy()
+            qfee_payload.update(
                 {
-                    "executor": ex["id"],
-                    "executor_name": ex["name"],
-                    "executeStatus": "0",
-                    "reformStatus": "0",
-                    "acceptStatus": "0",
-                    "isUnlock": "0",
-                    "startDate": f"{start_s} 00:00:00",
-                    "endDate": f"{start_s} 23:59:59",
-                    "excutorDefineCharacter": {},
-                    "_status": "Insert",
+                    "code": task_code_q,
+                    "resubmitCheckKey": _short_resubmit("task"),
+                    "org": org_id,
+                    "startDate": q_start_ts,
+                    "endDate": q_end_ts,
+                    "customer": customer_id,
+                    "customer_name": customer_name,
+                    "originator": owner_id,
+                    "originator_name": owner_name,
+                    "saleArea": sale_area,
+                    "dept": dept_id,
+                    "dept_name": dept_name,
+                    "content": f"{current} — {next_period_end}",
+                    "oppt": oppt_id,
+                    "opptStage": opp_stage,
+                    "ower": owner_id,
+                    "ower_name": owner_name,
+                    "systemSource": system_source,
+                    "taskDefineCharacter": {"RW01": amount_quarter} if amount_quarter is not None else {},
+                    "taskExecutorList": [],
+                    "taskRemindRuleList": list(_REMIND_RULE),
                 }
             )
-        _do_create("flt", flt_payload)
+            # 執行人只寫 008
+            qfee_payload["taskExecutorList"] = _build_executors(
+                (_EXEC_CN008,), q_start_ts, q_end_ts
+            )
+            qfee_payloads.append(qfee_payload)
+            current = _add_months(current, 3)
+
+        # 各季任務彼此獨立，用執行緒池並行送出：等待時間變成最大 RTT 而非總和
+        if len(qfee_payloads) == 1:
+            _do_create("qfee", qfee_payloads[0])
+        elif qfee_payloads:
+            with ThreadPoolExecutor(max_workers=min(8, len(qfee_payloads))) as pool:
+                for resp in pool.map(
+                    lambda p: client.create_task({"data": p}), qfee_payloads
+                ):
+                    results.append({"type": "qfee", "resp": resp})
+
+    # 任務2：更換濾芯（最近下次換芯日 -14，內容用物料名；執行人 003+005）
+    next_info = _find_next_replacement_date(data)
+    if next_info:
+        next_date, prod_name = next_info
+        start_date2 = next_date - timedelta(days=14)
+        start_s = start_date2.strftime("%Y-%m-%d")
+        # 任務內容：使用匹配到的物料全名；若缺失則寫更換濾芯
+        _do_create("flt", _build_dated_task("flt", start_s, prod_name or "更換濾芯"))
 
     # 任務3：續約換芯（合約到期日 -14，內容「續約」，執行人 003+005+008）
     if contract_end:
         try:
-            end_dt = datetime.strptime(str(contract_end).split(" ")[0], "%Y-%m-%d").date()
+            end_dt = _fast_ymd(contract_end)
+            if end_dt is None:
+                raise ValueError(f"無法解析合約到期日: {contract_end}")
             renew_start = end_dt - timedelta(days=14)
             renew_s = renew_start.strftime("%Y-%m-%d")
-            task_code_ren = "TASKREN" + datetime.now().strftime("%Y%m%d%H%M%S")
-            ren_payload = {
-                "code": task_code_ren,
-                "resubmitCheckKey": _short_resubmit("task"),
-                "org": settings.sales_org_id,
-                "taskTransType": "1984155413509046278",
-                "taskTransType_actionTransType": "1587879199387942917",
-                "taskTransType_actionTransTypeBustype": "1587877885106454533",
-                "bustype": "1984154477184679941",
-                "startDate": f"{renew_s} 00:00:00",
-                "endDate": f"{renew_s} 23:59:59",
-                "customer": customer_id,
-                "customer_name": customer_name,
-                "originator": owner_id,
-                "originator_name": owner_name,
-                "saleArea": sale_area,
-                "dept": settings.service_dept_id,
-                "dept_name": settings.service_dept_name,
-                "summary": "",
-                "content": "續約",
-                "oppt": oppt_id,
-                "opptStage": opp_stage,
-                "ower": owner_id,
-                "ower_name": owner_name,
-                "systemSource": settings.system_source,
-                "taskDefineCharacter": {},
-                "taskExecutorList": [],
-                "taskRemindRuleList": [
-                    {"remindPoint": "0", "advanceTime": "0", "timeUnit": "0", "_status": "Insert"}
-                ],
-                "_status": "Insert",
-            }
-            for ex in (
-                {"id": "1482551268133044232", "name": "客服003"},
-                {"id": "1655434173036888070", "name": "維修幫005"},
-                {"id": "1634618416471998473", "name": "出納008"},
-            ):
-                ren_payload["taskExecutorList"].append(
-                    {
-                        "executor": ex["id"],
-                        "executor_name": ex["name"],
-                        "executeStatus": "0",
-                        "reformStatus": "0",
-                        "acceptStatus": "0",
-                        "isUnlock": "0",
-                        "startDate": f"{renew_s} 00:00:00",
-                        "endDate": f"{renew_s} 23:59:59",
-                        "excutorDefineCharacter": {},
-                        "_status": "Insert",
-                    }
-                )
-            _do_create("ren", ren_payload)
-        except Exception as e:
-            print(f"[task] 創建續約任務失敗: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
+            # 任務內容固定寫「續約」
+            _do_create("ren", _build_dated_task("ren", renew_s, "續約"))
+        except Exception:
+            # log.exception 只在 handler 真的輸出時才格式化堆疊，免去 print_exc 的即時開銷
+            logger.exception("[task] 創建續約任務失敗")
 
     return {"message": "tasks created", "responses": results}
 
 
+# 商機 context 缺省欄位對照表：(context 鍵, normalized 來源鍵)，一對一直抄的都放這裡
+_OPPORTUNITY_CONTEXT_DEFAULTS: Tuple[Tuple[str, str], ...] = (
+    ("customerCode", "customerCode"),
+    ("installLocation", "address"),
+    ("planType", "installContent"),
+    ("rawText", "_raw_text"),
+    ("monthlyFee", "monthlyFee"),
+    ("deposit", "deposit"),
+    ("prepay", "prepay"),
+    ("contactTel", "contactTel"),
+    ("ownerHint", "ownerHint"),
+)
+
+# 銷售白名單映射按 settings 值快取；扁平 (id, name) tuple 免去每次重建巢狀 dict
+_OWNER_WHITELIST_CACHE: Dict[Tuple[str, str, str], Dict[str, Tuple[str, str]]] = {}
+
+
+def _owner_whitelist(settings: SubmissionSettings) -> Dict[str, Tuple[str, str]]:
+    key = (settings.owner_liz_id, settings.owner_james_id, settings.owner_liang_id)
+    cached = _OWNER_WHITELIST_CACHE.get(key)
+    if cached is None:
+        cached = {
+            "liz": (settings.owner_liz_id, "LIZ"),
+            "james": (settings.owner_james_id, "James"),
+            "成": (settings.owner_liang_id, "成"),
+            "寧": (settings.owner_james_id, "寧"),
+        }
+        _OWNER_WHITELIST_CACHE[key] = cached
+    return cached
+
+
 def _create_opportunity_for_customer(
     normalized: Dict[str, Any],
     settings: SubmissionSettings,
@@ -2513,84 +2645,59 @@ def _create_opportunity_for_customer(
     audit_passed: bool,
     client: CRMClient,
 ) -> Dict[str, Any]:
-    context = dict(normalized.get("opportunityContext") or {})
-    if not context:
+    # 先跑完所有不花錢的否決條件，skip 路徑連 context 複本都不用建
+    source_context = normalized.get("opportunityContext") or {}
+    if not source_context:
         return {"skipped": True, "reason": "未提供商機欄位"}
     if not audit_passed:
         return {"skipped": True, "reason": "客戶尚未審核通過，暫不建立商機"}
     customer_id = (
         _extract_created_customer_id(application_response)
-        or context.get("customerId")
+        or source_context.get("customerId")
         or _extract_customer_entity_id(application_response)
         or _lookup_customer_id_by_code(
-            context.get("customerCode") or normalized.get("customerCode"), client
+            source_context.get("customerCode") or normalized.get("customerCode"),
+            client,
         )
     )
     if not customer_id:
         return {"skipped": True, "reason": "CRM 回傳缺少客戶 ID，無法建立商機"}
+    context = dict(source_context)
     context.setdefault("customerId", customer_id)
-    context.setdefault(
-        "customerName",
-        context.get("customerName")
-        or normalized.get("displayName")
-        or normalized.get("baseName"),
-    )
-    context.setdefault(
-        "customerCode",
-        context.get("customerCode") or normalized.get("customerCode"),
-    )
-    
-    # 調試日誌：確認 context 已正確設置
-    print(f"[opportunity] Context設置完成 - customerId: {context.get('customerId')}", flush=True)
-    print(f"[opportunity] Context設置完成 - customerName: {context.get('customerName')}", flush=True)
-    print(f"[opportunity] Context設置完成 - customerCode: {context.get('customerCode')}", flush=True)
-    context.setdefault(
-        "installLocation", context.get("installLocation") or normalized.get("address")
-    )
-    context.setdefault(
-        "usageLabel",
-        context.get("usageLabel")
-        or normalized.get("usageLabel")
-        or (normalized.get("usageMode") or {}).get("label"),
-    )
-    context.setdefault(
-        "planType", context.get("planType") or normalized.get("installContent")
-    )
-    context.setdefault("rawText", normalized.get("_raw_text"))
-    context.setdefault(
-        "monthlyFee", context.get("monthlyFee") or normalized.get("monthlyFee")
-    )
-    context.setdefault("deposit", context.get("deposit") or normalized.get("deposit"))
-    context.setdefault("prepay", context.get("prepay") or normalized.get("prepay"))
-    context.setdefault(
-        "saleAreaId",
-        context.get("saleAreaId") or (normalized.get("saleArea") or {}).get("id"),
-    )
-    context.setdefault(
-        "contactTel", context.get("contactTel") or normalized.get("contactTel")
+    if "customerName" not in context:
+        context["customerName"] = (
+            normalized.get("displayName") or normalized.get("baseName")
+        )
+    # 一對一的預設值走資料表合併，一次迴圈取代逐鍵 setdefault
+    for key, src in _OPPORTUNITY_CONTEXT_DEFAULTS:
+        if key not in context:
+            context[key] = normalized.get(src)
+    if "usageLabel" not in context:
+        context["usageLabel"] = (
+            normalized.get("usageLabel")
+            or (normalized.get("usageMode") or {}).get("label")
+        )
+    if "saleAreaId" not in context:
+        context["saleAreaId"] = (normalized.get("saleArea") or {}).get("id")
+
+    # 調試日誌：確認 context 已正確設置；%-format 延遲到真的要輸出才格式化
+    logger.debug(
+        "[opportunity] Context設置完成 - customerId=%s customerName=%s customerCode=%s",
+        context.get("customerId"),
+        context.get("customerName"),
+        context.get("customerCode"),
     )
     owner_block = normalized.get("owner") or {}
-    # 保存使用者輸入的銷售信息（原始文本）
-    context.setdefault("ownerHint", context.get("ownerHint") or normalized.get("ownerHint"))
     context.setdefault("ownerId", context.get("ownerId") or owner_block.get("id"))
     context.setdefault(
         "ownerName", context.get("ownerName") or owner_block.get("name")
     )
     # 銷售白名單：liz/LIZ、james/James/成/寧，其他統一為客服003
-    # 根據名字映射到對應的 ID 和顯示名稱
-    owner_mapping = {
-        "liz": {"id": settings.owner_liz_id, "name": "LIZ"},
-        "james": {"id": settings.owner_james_id, "name": "James"},
-        "成": {"id": settings.owner_liang_id, "name": "成"},
-        "寧": {"id": settings.owner_james_id, "name": "寧"},
-    }
-    
     owner_hint_lower = (context.get("ownerHint") or "").strip().lower()
-    
-    if owner_hint_lower in owner_mapping:
+    hit = _owner_whitelist(settings).get(owner_hint_lower)
+    if hit:
         # 在白名單中，使用對應的 owner 信息
-        context["ownerId"] = owner_mapping[owner_hint_lower]["id"]
-        context["ownerName"] = owner_mapping[owner_hint_lower]["name"]
+        context["ownerId"], context["ownerName"] = hit
     else:
         # 非白名單（包含空白），統一使用客服003
         context["ownerId"] = settings.service_owner_id
@@ -2606,7 +2713,21 @@ def _create_opportunity_for_customer(
             years_value = _determine_contract_years(context.get("planType") or "", settings)
             context["contractYears"] = years_value
         if monthly_value and years_value:
-            context["expectSignMoney"] = float(monthly_value) * int(years_value) * 12.0
+            # 整數月費走 int 快路徑：沒有浮點誤差，下游 _format_amount 結果相同。
+            # int() 對 float 不會拋錯而是無聲截斷，必須先確認兩個值都是整數值
+            use_int = False
+            try:
+                monthly_f = float(monthly_value)
+                years_f = float(years_value)
+                use_int = monthly_f.is_integer() and years_f.is_integer()
+            except (TypeError, ValueError):
+                pass
+            if use_int:
+                context["expectSignMoney"] = int(monthly_f) * int(years_f) * 12
+            else:
+                context["expectSignMoney"] = (
+                    float(monthly_value) * int(years_value) * 12.0
+                )
     else:
         context.setdefault(
             "contractYears",
@@ -2616,7 +2737,7 @@ def _create_opportunity_for_customer(
     if not context.get("contractStartDate"):
         install_time = (normalized.get("installTime") or {}).get("display")
         if install_time:
-            context["contractStartDate"] = install_time.split(" ")[0]
+            context["contractStartDate"] = install_time.partition(" ")[0]
     if context.get("contractStartDate") and not context.get("contractEndDate"):
         years_value = context.get("contractYears")
         if years_value:
@@ -2654,11 +2775,11 @@ def _create_opportunity_for_customer(
     # 付款兜底：若缺 paymentCode 但方案類型是純數字碼，視為付款方式代碼
     if not context.get("paymentCode"):
         plan_raw = (context.get("planType") or "").strip()
-        if re.fullmatch(r"\d{2,3}", plan_raw):
+        if _PAYMENT_CODE_RE.fullmatch(plan_raw):
             context["paymentCode"] = plan_raw
 
     # 安裝位置兜底：若像「C碼+姓名+電話」且有地址，用客戶地址替換
-    if context.get("installLocation") and re.search(r"C\d+.+\d{6,}", str(context["installLocation"])):
+    if context.get("installLocation") and _INSTALL_LOC_BAD_RE.search(str(context["installLocation"])):
         addr = normalized.get("address") or context.get("address")
         if addr:
             context["installLocation"] = addr
@@ -2707,7 +2828,7 @@ def _create_opportunity_for_customer(
         result["reason"] = str(exc)
         return result
     result["createResponse"] = create_response
-    result["success"] = str(create_response.get("code")) in {"200", "00000"}
+    result["success"] = str(create_response.get("code")) in _SUCCESS_CODES
     if not result["success"]:
         result["reason"] = create_response.get("message")
     result["skipped"] = False
@@ -2726,7 +2847,7 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
         raise ValueError("請提供銷售文案內容。")
 
     # 先初始化 settings，後續代碼需要使用
-    settings = SubmissionSettings()
+    settings = get_settings()
 
     parse_result = parse_customer_text(text)
     normalized = parse_result["normalized"]
@@ -2780,12 +2901,17 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
     client = CRMClient()
 
     duplicate_payload = build_duplicate_payload(normalized, settings)
-    try:
-        duplicate_response = client.customer_duplicate_check(duplicate_payload)
-        duplicates = duplicate_response.get("data") or []
-    except RuntimeError as exc:
-        duplicate_response = {"error": str(exc)}
-        duplicates = []
+    # 重複檢查純粹在等網路，期間先在本執行緒把 apply payload 建好，
+    # 端到端延遲省下 CPU 構建時間
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        dup_future = pool.submit(client.customer_duplicate_check, duplicate_payload)
+        apply_payload = build_apply_payload(normalized, settings)
+        try:
+            duplicate_response = dup_future.result()
+            duplicates = duplicate_response.get("data") or []
+        except RuntimeError as exc:
+            duplicate_response = {"error": str(exc)}
+            duplicates = []
 
     result: Dict[str, Any] = {
         "duplicateResponse": duplicate_response,
@@ -2803,7 +2929,6 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
     def _do_submit(payload_data: Dict[str, Any]) -> Dict[str, Any]:
         return client.submit_customer_application(payload_data)
 
-    apply_payload = build_apply_payload(normalized, settings)
     try:
         application_response = _do_submit(apply_payload)
     except RuntimeError as exc:
@@ -2814,7 +2939,10 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
                 warnings.append(
                     f"原客戶編碼因 CRM 待審申請被鎖定，已改為 {regenerated_code} 後重新送出。"
                 )
-                duplicate_payload = build_duplicate_payload(normalized, settings)
+                # 只有編碼衍生欄位變了，修補原 payload 即可，不必重跑兩個 builder
+                _patch_payloads_after_code_change(
+                    apply_payload, duplicate_payload, normalized, settings
+                )
                 try:
                     duplicate_response = client.customer_duplicate_check(
                         duplicate_payload
@@ -2827,7 +2955,6 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
                 if duplicates:
                     result["message"] = "發現重複客戶，已停止送出。"
                     return result
-                apply_payload = build_apply_payload(normalized, settings)
                 try:
                     application_response = _do_submit(apply_payload)
                 except RuntimeError as retry_exc:
@@ -2864,7 +2991,7 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
     result["submitted"] = True
     result["applicationResponse"] = application_response
     response_code = str(application_response.get("code") or "")
-    if response_code not in {"200", "00000"}:
+    if response_code not in _SUCCESS_CODES:
         result["message"] = application_response.get("message") or "客戶申請提交失敗"
         return result
 
@@ -2922,6 +3049,7 @@ def run_submission(text: str, *, skip_audit: bool = False, **kwargs) -> Dict[str
 
 __all__ = [
     "SubmissionSettings",
+    "get_settings",
     "build_duplicate_payload",
     "build_apply_payload",
     "build_audit_payload",
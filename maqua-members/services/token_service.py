@@ -1,6 +1,8 @@
 """Token retrieval and caching for YonBIP APIs."""
 from __future__ import annotations
 
+import base64
+import hmac
 import threading
 import time
 from dataclasses import dataclass
@@ -20,11 +22,33 @@ class CachedToken:
 class TokenService:
     _lock = threading.Lock()
 
+    # 距離到期這麼多秒內就先在背景預先換發，前景請求不必等網路
+    _refresh_window = 120
+
     def __init__(self) -> None:
         self._cache: Optional[CachedToken] = None
         self._last_expire: int = 7200
+        self._refreshing = False
+        # 簽名密鑰只編碼一次；每次取 token 不再重複 UTF-8 encode
+        self._secret_bytes: bytes = config.APP_SECRET.encode("utf-8")
+        # 常駐 Session 重用 keep-alive 連線，換發 token 免重做 DNS/TLS 握手
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
     def get_token(self, *, force_refresh: bool = False) -> str:
+        if not force_refresh:
+            # 無鎖快路徑：token 還很新鮮就直接回，併發讀不搶同一把鎖
+            cached = self._cache
+            now = time.time()
+            if cached and now < cached.expires_at - self._refresh_window:
+                return cached.token
+            if cached and now < cached.expires_at:
+                # 進入預刷新窗口：背景換發，當前請求仍用尚未到期的 token
+                self._spawn_refresh()
+                return cached.token
+
         with self._lock:
             now = time.time()
             if (
@@ -39,14 +63,33 @@ class TokenService:
             self._cache = CachedToken(token=token, expires_at=expires_at)
             return token
 
+    def _spawn_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            token = self._fetch_token()
+            expires_at = time.time() + max(self._last_expire - 60, 60)
+            with self._lock:
+                self._cache = CachedToken(token=token, expires_at=expires_at)
+        except Exception:
+            # 背景換發失敗不致命：到期後前景路徑仍會同步重抓
+            pass
+        finally:
+            self._refreshing = False
+
     def _fetch_token(self) -> str:
         timestamp = str(int(time.time() * 1000))
         params = {"appKey": config.APP_KEY, "timestamp": timestamp}
-        signature = self._build_signature(params, config.APP_SECRET)
+        signature = self._build_signature(params, self._secret_bytes)
         params["signature"] = signature
 
         url = config.TOKEN_URL.rstrip("/") + config.SELF_APP_TOKEN_PATH
-        resp = requests.get(url, params=params, timeout=12)
+        resp = self._session.get(url, params=params, timeout=12)
         resp.raise_for_status()
         data = resp.json()
         if data.get("code") != "00000":
@@ -59,17 +102,14 @@ class TokenService:
         return token
 
     @staticmethod
-    def _build_signature(params: dict[str, str], secret: str) -> str:
+    def _build_signature(params: dict[str, str], secret: bytes) -> str:
         to_sign = f"appKey{params.get('appKey', '')}timestamp{params.get('timestamp', '')}"
         return TokenService._hmac_sha256(secret, to_sign)
 
     @staticmethod
-    def _hmac_sha256(secret: str, message: str) -> str:
-        import base64
-        import hashlib
-        import hmac
-
-        digest = hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).digest()
+    def _hmac_sha256(secret: bytes, message: str) -> str:
+        # hmac.digest 是一次性的 C 快速路徑，免建 Python 層 HMAC 物件
+        digest = hmac.digest(secret, message.encode("utf-8"), "sha256")
         return base64.b64encode(digest).decode("utf-8")
 
 
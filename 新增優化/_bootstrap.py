@@ -0,0 +1,13 @@
+"""debug／測試腳本共用的 sys.path 引導。
+
+本目錄只插入一次（有成員檢查），sys.path 不會隨腳本互相引用越疊越長，
+之後每個 import 的搜尋迴圈也就越短；Path 寫法免去 os.path.abspath
+每次呼叫 getcwd() 的系統呼叫。
+"""
+
+import sys
+from pathlib import Path
+
+_HERE = str(Path(__file__).parent)
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
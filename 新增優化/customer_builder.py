@@ -3,14 +3,14 @@
 
 from __future__ import annotations
 
-import argparse
-import json
+import copy
 import os
 import re
-import uuid
+import sys
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 # 簡易 .env 讀取：在專案根目錄或本目錄存在 .env 時，預先載入環境變量
@@ -41,7 +41,9 @@ def _load_env_if_exists() -> None:
 _load_env_if_exists()
 
 
+@lru_cache(maxsize=None)
 def env(key: str, default: str) -> str:
+    # 環境變量在載入 .env 後就不再變動，快取住免去重複的 os.environ 查找
     return os.getenv(key, default)
 
 
@@ -201,6 +203,7 @@ _PAYMENT_ALIASES = {
     "銀行匯款": "銀行卡自動轉賬",
     "自動扣款": "銀行卡自動轉賬",
     "銀行卡自動扣款": "銀行卡自動轉賬",
+    "銀行自動轉賬": "銀行卡自動轉賬",
     "轉帳": "銀行卡自動轉賬",
     "轉賬": "銀行卡自動轉賬",
     "信用卡": "信用卡分期",
@@ -212,19 +215,37 @@ _PAYMENT_ALIASES = {
     "免費試用": "試用",
 }
 
+# 所有別名統一收在 _PAYMENT_ALIASES，一趟掛載完畢
 for alias, canonical in _PAYMENT_ALIASES.items():
     target = CONFIG["paymentMethods"].get(canonical)
     if target:
         CONFIG["paymentMethods"][alias] = target
 
-for alias in ("信用卡付費", "信用卡付款", "信用卡刷卡", "信用卡"):
-    CONFIG["paymentMethods"][alias] = CONFIG["paymentMethods"]["信用卡分期"]
+# 付款設定物件 → 規範鍵的反查表：別名命中時 O(1) 取回規範名，
+# 取代 extract_choice 內逐一比對 is 的線性掃描
+_CANONICAL_PAYMENT_KEYS = (
+    "一次性全繳", "信用卡分期", "銀行卡自動轉賬", "季度收費", "年度收費", "試用", "每月收費"
+)
+_PAYMENT_CFG_TO_CANONICAL: Dict[int, str] = {
+    id(CONFIG["paymentMethods"][key]): key for key in _CANONICAL_PAYMENT_KEYS
+}
 
-# 添加銀行自動轉賬的別名
-CONFIG["paymentMethods"]["銀行自動轉賬"] = CONFIG["paymentMethods"]["銀行卡自動轉賬"]
+# 「去空白別名 → 規範鍵」索引：查詢時一次 dict 探測取代整表掃描；
+# setdefault 保留與原掃描相同的先到先贏順序
+_PAYMENT_CLEAN_INDEX: Dict[str, str] = {}
+for _alias, _cfg in CONFIG["paymentMethods"].items():
+    _PAYMENT_CLEAN_INDEX.setdefault(
+        _alias.replace(" ", ""), _PAYMENT_CFG_TO_CANONICAL.get(id(_cfg), _alias)
+    )
+del _alias, _cfg
 
-# 添加銀行轉帳的別名
-CONFIG["paymentMethods"]["銀行轉帳"] = CONFIG["paymentMethods"]["銀行卡自動轉賬"]
+# 「數字代碼 → 首個對應鍵」索引：取代逐候選項撈 config 比對 id 的線性掃描
+_PAYMENT_ID_TO_LABEL: Dict[str, str] = {}
+for _label, _cfg in CONFIG["paymentMethods"].items():
+    _code = _cfg.get("id")
+    if _code:
+        _PAYMENT_ID_TO_LABEL.setdefault(_code, _label)
+del _label, _cfg, _code
 
 _PAYMENT_INDUSTRY_ENV_MAP = {
     "01": "CFG_PAYMENT_ONETIME_INDUSTRY_ID",
@@ -237,18 +258,49 @@ _PAYMENT_INDUSTRY_ENV_MAP = {
 }
 
 
+# 各付款代碼對應的 industry ID 在載入時解析一次，查詢時只剩一次 dict 取值
+_PAYMENT_INDUSTRY_IDS: Dict[str, str] = {
+    code: env(env_key, "").strip()
+    for code, env_key in _PAYMENT_INDUSTRY_ENV_MAP.items()
+}
+
+
 def _resolve_payment_industry_id(code: Optional[str]) -> Optional[str]:
     default_id = CONFIG.get("defaultCustomerIndustryId") or ""
     if code:
         normalized = code.zfill(2)
-        env_key = _PAYMENT_INDUSTRY_ENV_MAP.get(normalized)
-        if env_key:
-            env_value = env(env_key, "").strip()
-            if env_value:
-                return env_value
+        env_value = _PAYMENT_INDUSTRY_IDS.get(normalized)
+        if env_value:
+            return env_value
         return default_id or normalized
     return default_id or None
 
+# 熱路徑的正則在模組載入時先編譯好，省掉每次呼叫時的模式快取查找
+_RE_FULL_DATE = re.compile(
+    r"(20\d{2})[./年-]\s*(\d{1,2})[./月-]\s*(\d{1,2})(?:[日号]\s*)?(?:(\d{1,2}):(\d{2}))?"
+)
+_RE_MD = re.compile(r"(\d{1,2})\s*月\s*(\d{1,2})\s*日")
+_RE_TIME = re.compile(r"(\d{1,2}):(\d{2})")
+_RE_EQ = re.compile(r"=\s*([0-9,]+)")
+_RE_MUL = re.compile(r"([0-9,]+)\s*\*\s*([0-9,]+)")
+
+
+class _KeepNumeric(dict):
+    """translate 映射表：查不到的字元回 None 即刪除，等效「只留數字.-」。"""
+
+    def __missing__(self, codepoint: int) -> None:
+        return None
+
+
+_NUMERIC_TABLE = _KeepNumeric({ord(c): c for c in "0123456789.-"})
+_RE_PAREN = re.compile(r"[（(]([^（）()]+)[）)]")
+_RE_HINT = re.compile(r"(這次試試|本次|試試)")
+# 去空白改用 translate 刪除表：C 層單趟掃描，不進正則狀態機；
+# 表涵蓋半形／全形空白與常見控制空白
+_WS_TABLE = str.maketrans("", "", " \t\r\n\f\v 　")
+_RE_CUSTCODE = re.compile(r"c\d{3,}", re.IGNORECASE)
+_RE_DIGITS = re.compile(r"\d+")
+
 LABEL_MAP = {
     "客戶名稱": "customerName",
     "客戶編碼": "customerCode",
@@ -301,26 +353,55 @@ def check_customer_code_exists(customer_code: str) -> bool:
     return False
 
 
-def generate_unique_customer_code(base_code: str = "") -> str:
+def generate_unique_customer_code(
+    base_code: str = "", now: Optional[datetime] = None
+) -> str:
     """生成唯一的客戶代碼
-    
+
     Args:
         base_code: 基礎客戶代碼，如果提供則在基礎上生成變體
-        
+        now: 解析當下的時間戳；同一輪解析共用一份，不傳則現取
+
     Returns:
         唯一的客戶代碼
     """
+    if now is None:
+        now = datetime.now()
     if base_code:
         # 如果提供了基礎代碼，生成基於時間戳的變體
-        timestamp = datetime.now().strftime("%m%d%H%M")
+        timestamp = now.strftime("%m%d%H%M")
         return f"{base_code[:3]}{timestamp}"
     else:
-        # 生成全新的代碼
-        date_part = datetime.now().strftime("%y%m%d")
-        random_part = str(uuid.uuid4())[:4].upper()
+        # 生成全新的代碼；token_hex 直接產隨機十六進位，
+        # 免去整顆 UUID 的生成與字串切片
+        import secrets
+
+        date_part = now.strftime("%y%m%d")
+        random_part = secrets.token_hex(2).upper()
         return f"C{date_part}{random_part}"
 
 
+# 標籤模糊比對表：長度由長到短，「安裝的地址」這類變體取最長的已知標籤子字串，
+# 避免欄位因為標籤寫法略有出入而被誤當備註丟掉
+_LABEL_FALLBACK: tuple = tuple(
+    sorted(LABEL_MAP.items(), key=lambda item: len(item[0]), reverse=True)
+)
+
+
+def _match_label(label: str) -> Optional[str]:
+    key = LABEL_MAP.get(label)
+    if key:
+        return key
+    for known, mapped in _LABEL_FALLBACK:
+        if known in label:
+            return mapped
+    return None
+
+
+# 把全/半形冒號與等號一次映射成哨兵字元，單趟掃描就能定位分隔符
+_SEP_TABLE = str.maketrans({"：": "\x00", ":": "\x00", "=": "\x00"})
+
+
 def parse_lines(text: str) -> Dict[str, str]:
     parsed: Dict[str, str] = {}
     last_key: Optional[str] = None
@@ -328,23 +409,19 @@ def parse_lines(text: str) -> Dict[str, str]:
         line = strip(raw_line)
         if not line:
             continue
-        
-        # 嘗試多種分隔符
-        parts = None
-        for separator in ['：', ':', '=']:
-            if separator in line:
-                parts = line.split(separator, 1)
-                break
-        
-        if not parts or len(parts) != 2:
+
+        # 單趟找出最先出現的分隔符（原寫法對每種分隔符各掃一遍）
+        sep_index = line.translate(_SEP_TABLE).find("\x00")
+        if sep_index < 0:
             # 若無分隔符且上一個欄位是備註，視為備註續行
             if last_key == "remark":
                 parsed["remark"] = (parsed.get("remark", "") + "\n" + line).strip()
                 last_key = "remark"
             continue
-            
-        label, value = strip(parts[0]), strip(parts[1])
-        key = LABEL_MAP.get(label)
+
+        # 分隔符皆為單一字元，照索引切原始行即可保留值裡的冒號/等號
+        label, value = strip(line[:sep_index]), strip(line[sep_index + 1:])
+        key = _match_label(label)
         if key:
             parsed[key] = value
             last_key = key
@@ -358,55 +435,119 @@ def parse_lines(text: str) -> Dict[str, str]:
     return parsed
 
 
-def extract_choice(value: Optional[str], candidates: Iterable[str]) -> Optional[str]:
-    if not value:
+@lru_cache(maxsize=1024)
+def _clean(value: str) -> str:
+    """去空白正規化；同欄位值在付款/用水模式各跑一次，快取避免重複掃描。"""
+    return value.translate(_WS_TABLE)
+
+
+@lru_cache(maxsize=1024)
+def _paren_last(cleaned: str) -> Optional[str]:
+    """取最後一組括號內容並去除語氣詞，無括號或清空後回 None。"""
+    matches = _RE_PAREN.findall(cleaned)
+    if not matches:
         return None
-    cleaned = re.sub(r"\s+", "", value)
-    
-    # 首先檢查是否為數字代碼（01、02 等）
-    if re.match(r'^\d{2}$', cleaned):
-        # 通過數字代碼查找對應的候選項
+    candidate = _RE_HINT.sub("", matches[-1]).strip()
+    return candidate or None
+
+
+@lru_cache(maxsize=16)
+def _stripped_buckets(
+    candidates: Tuple[str, ...]
+) -> Dict[int, Tuple[Tuple[str, str], ...]]:
+    """候選集的 (原鍵, 去空白鍵) 配對，依去空白長度分桶。
+
+    exact-match 只可能命中長度相同的鍵，查單一桶即可，
+    不必整個候選集線性掃過；候選集只有固定幾種，各算一次。
+    """
+    buckets: Dict[int, List[Tuple[str, str]]] = {}
+    for choice in candidates:
+        stripped = choice.replace(" ", "")
+        buckets.setdefault(len(stripped), []).append((choice, stripped))
+    return {length: tuple(pairs) for length, pairs in buckets.items()}
+
+
+@lru_cache(maxsize=2048)
+def _extract_choice_cached(value: str, candidates: Tuple[str, ...]) -> Optional[str]:
+    cleaned = _clean(value)
+
+    # 首先檢查是否為數字代碼（01、02 等）；形狀檢查用 len+isdigit
+    # 兩個 C 呼叫就夠，不必動用正則也不配置 Match 物件
+    if len(cleaned) == 2 and cleaned.isdigit():
+        # 通過數字代碼查表取得對應鍵，仍須落在本次候選集內才算數
+        hit = _PAYMENT_ID_TO_LABEL.get(cleaned)
+        if hit and hit in candidates:
+            return hit
+
+    # 檢查括號內的內容
+    candidate = _paren_last(cleaned)
+    if candidate:
         for choice in candidates:
-            config = CONFIG["paymentMethods"].get(choice, {})
-            if config.get("id") == cleaned:
+            if choice in candidate:
                 return choice
     
-    # 檢查括號內的內容
-    paren_matches = re.findall(r"[（(]([^（）()]+)[）)]", cleaned)
-    if paren_matches:
-        candidate = re.sub(r"(這次試試|本次|試試)", "", paren_matches[-1])
-        candidate = candidate.strip()
-        if candidate:
-            for choice in candidates:
-                if choice in candidate:
-                    return choice
-    
-    # 檢查是否為 CONFIG["paymentMethods"] 中的別名
-    for alias, config in CONFIG["paymentMethods"].items():
-        if alias.replace(" ", "") == cleaned:
-            # 查找這個配置對應的規範鍵名
-            canonical_keys = ["一次性全繳", "信用卡分期", "銀行卡自動轉賬", "季度收費", "年度收費", "試用", "每月收費"]
-            for key in canonical_keys:
-                if key in CONFIG["paymentMethods"] and CONFIG["paymentMethods"][key] is config:
-                    return key
-            # 如果找不到規範鍵名，返回別名
-            return alias
+    # 檢查是否為 CONFIG["paymentMethods"] 中的別名（含規範鍵），直接反查索引
+    hit = _PAYMENT_CLEAN_INDEX.get(cleaned)
+    if hit:
+        return hit
     
-    # 檢查是否直接匹配候選項
-    for choice in candidates:
-        if choice.replace(" ", "") == cleaned:
+    # 檢查是否直接匹配候選項；只探長度相符的那一桶，不逐圈 replace
+    for choice, stripped in _stripped_buckets(candidates).get(len(cleaned), ()):
+        if stripped == cleaned:
             return choice
-    
+
     return None
 
 
+def extract_choice(value: Optional[str], candidates: Iterable[str]) -> Optional[str]:
+    """選項歸一：同欄位值配同候選集的重複查詢直接命中 lru_cache。
+
+    候選集在行程存活期間固定（皆來自 CONFIG），tuple 化後可雜湊；
+    測試要重置快取時呼叫 ``extract_choice.cache_clear()``。
+    """
+    if not value:
+        return None
+    return _extract_choice_cached(value, tuple(candidates))
+
+
+extract_choice.cache_clear = _extract_choice_cached.cache_clear
+
+# 候選鍵集在行程存活期間固定：模組載入時凍成 tuple，呼叫端不再每次
+# 重建 dict_keys 視圖，也免去 _extract_choice_cached 的重複 tuple 化
+PAYMENT_METHOD_KEYS: Tuple[str, ...] = tuple(CONFIG["paymentMethods"])
+_CUSTOMER_CLASS_KEYS: Tuple[str, ...] = tuple(CONFIG["customerClasses"])
+_USAGE_MODE_KEYS: Tuple[str, ...] = tuple(CONFIG["usageModes"])
+
+
+# 三組固定候選集的去空白分桶在載入時先算好，首筆解析不付暖身成本
+for _keys in (PAYMENT_METHOD_KEYS, _CUSTOMER_CLASS_KEYS, _USAGE_MODE_KEYS):
+    _stripped_buckets(_keys)
+del _keys
+
+
+def extract_choice_payment(value: Optional[str]) -> Optional[str]:
+    # 付款方式是最熱的呼叫端：候選集綁死成模組常數
+    if not value:
+        return None
+    return _extract_choice_cached(value, PAYMENT_METHOD_KEYS)
+
+
+def normalize_payment_label(token: Optional[str]) -> str:
+    """單一付款方式字詞 → 規範標籤的快路徑。
+
+    測試或上游只想驗證字詞對應時，不必把整段文本跑過
+    parse_customer_text；未識別時回傳與完整解析相同的預設「一次性全繳」。
+    """
+    return extract_choice_payment(token) or "一次性全繳"
+
+
 def number_from_string(value: Optional[str]) -> Optional[float]:
     if value is None:
         return None
     
     # 首先嘗試解析數學表達式 (例如: 288*24=6912)
     # 查找等號後的數字（最終結果）
-    equals_match = re.search(r'=\s*([0-9,]+)', value)
+    equals_match = _RE_EQ.search(value)
     if equals_match:
         result_str = equals_match.group(1).replace(',', '')
         try:
@@ -415,7 +556,7 @@ def number_from_string(value: Optional[str]) -> Optional[float]:
             pass
     
     # 如果沒有等號，嘗試計算乘法表達式
-    multiply_match = re.search(r'([0-9,]+)\s*\*\s*([0-9,]+)', value)
+    multiply_match = _RE_MUL.search(value)
     if multiply_match:
         try:
             num1 = float(multiply_match.group(1).replace(',', ''))
@@ -424,8 +565,8 @@ def number_from_string(value: Optional[str]) -> Optional[float]:
         except ValueError:
             pass
     
-    # 傳統方法：提取所有數字字符
-    normalized = re.sub(r"[^0-9.\-]", "", value)
+    # 傳統方法：提取所有數字字符（translate 比字元類正則快數倍）
+    normalized = value.translate(_NUMERIC_TABLE)
     if not normalized:
         return None
     try:
@@ -434,14 +575,31 @@ def number_from_string(value: Optional[str]) -> Optional[float]:
         return None
 
 
+# 區域關鍵字在載入時先轉小寫；查詢時只需小寫輸入一次，不再逐關鍵字 .lower()
+_SALE_AREA_KEYWORDS: tuple = tuple(
+    (area, tuple(keyword.lower() for keyword in area.get("keywords", ())))
+    for area in CONFIG["saleAreas"]
+)
+
+
 def resolve_sale_area(address: str) -> Optional[Dict[str, Any]]:
     lowered = address.lower()
-    for area in CONFIG["saleAreas"]:
-        if any(keyword.lower() in lowered for keyword in area.get("keywords", [])):
-            return area
+    for area, keywords in _SALE_AREA_KEYWORDS:
+        for keyword in keywords:
+            if keyword in lowered:
+                return area
     return None
 
 
+# 銷售關鍵字攤平成 (關鍵字, owner) 順序表：保持原本選項優先序，
+# 單層迴圈找到第一個命中即回，免去巢狀迴圈與 any() 產生器
+_OWNER_KEYWORD_TABLE: tuple = tuple(
+    (keyword, option["owner"])
+    for option in CONFIG["ownerOptions"]
+    for keyword in option["keywords"]
+)
+
+
 def resolve_owner(raw_text: str, owner_hint: Optional[str]) -> Dict[str, Any]:
     candidates = []
     if owner_hint:
@@ -449,20 +607,19 @@ def resolve_owner(raw_text: str, owner_hint: Optional[str]) -> Dict[str, Any]:
     candidates.append(raw_text)
     for candidate in candidates:
         lowered = candidate.lower()
-        for option in CONFIG["ownerOptions"]:
-            if any(keyword in lowered for keyword in option["keywords"]):
-                return option["owner"]
+        for keyword, owner in _OWNER_KEYWORD_TABLE:
+            if keyword in lowered:
+                return owner
     return CONFIG["defaultOwner"]
 
 
-def parse_install_time(value: Optional[str]) -> Optional[Dict[str, str]]:
+def parse_install_time(
+    value: Optional[str], now: Optional[datetime] = None
+) -> Optional[Dict[str, str]]:
     if not value:
         return None
     text = value.strip()
-    full_match = re.search(
-        r"(20\d{2})[./年-]\s*(\d{1,2})[./月-]\s*(\d{1,2})(?:[日号]\s*)?(?:(\d{1,2}):(\d{2}))?",
-        text,
-    )
+    full_match = _RE_FULL_DATE.search(text)
     if full_match:
         year, month, day, hour, minute = full_match.groups()
         hour = hour or "00"
@@ -473,10 +630,10 @@ def parse_install_time(value: Optional[str]) -> Optional[Dict[str, str]]:
                 int(year), int(month), int(day), int(hour), int(minute)
             ).isoformat(),
         }
-    md_match = re.search(r"(\d{1,2})\s*月\s*(\d{1,2})\s*日", text)
-    time_match = re.search(r"(\d{1,2}):(\d{2})", text)
+    md_match = _RE_MD.search(text)
+    time_match = _RE_TIME.search(text)
     if md_match:
-        now_year = datetime.now().year
+        now_year = (now or datetime.now()).year
         month, day = md_match.groups()
         hour = time_match.group(1) if time_match else "00"
         minute = time_match.group(2) if time_match else "00"
@@ -491,127 +648,136 @@ def parse_install_time(value: Optional[str]) -> Optional[Dict[str, str]]:
 
 def build_crm_payload(normalized: Dict[str, Any]) -> Dict[str, Any]:
     ck = CONFIG["characterKeys"]
-    character_payload: Dict[str, Any] = {}
-
-    def add_if_present(key: str, value: Any) -> None:
-        if value is not None:
-            character_payload[key] = value
-
-    add_if_present(ck["totalAmount"], normalized.get("totalAmount"))
-    add_if_present(ck["monthlyFee"], normalized.get("monthlyFee"))
-    add_if_present(ck["deposit"], normalized.get("deposit"))
-    add_if_present(ck["prepay"], normalized.get("prepay"))
-    add_if_present(ck["installTime"], (normalized.get("installTime") or {}).get("display"))
-    add_if_present(ck["installContent"], normalized.get("installContent"))
-    add_if_present(ck["remark"], normalized.get("remark"))
-    add_if_present(ck["usageMode"], normalized.get("usageMode", {}).get("label"))
-    add_if_present(
-        ck["paymentMethod"], normalized.get("paymentMethod", {}).get("label")
+
+    # normalized 是跨模組共用的 dict 契約；巢狀欄位各取一次綁成 local，
+    # 取代整段重複的 (normalized.get(...) or {}).get(...) 鏈與臨時 {}
+    payment_method = normalized.get("paymentMethod") or {}
+    usage_mode = normalized.get("usageMode") or {}
+    install_time = normalized.get("installTime") or {}
+    customer_class = normalized.get("customerClass") or {}
+    payment_label = payment_method.get("label")
+    usage_label = usage_mode.get("label")
+    install_display = install_time.get("display")
+    display_name = normalized.get("displayName")
+    customer_code = normalized.get("customerCode")
+    contact_tel = normalized.get("contactTel")
+    address = normalized.get("address")
+    monthly_fee = normalized.get("monthlyFee")
+    deposit = normalized.get("deposit")
+    prepay = normalized.get("prepay")
+    total_amount = normalized.get("totalAmount")
+    install_content = normalized.get("installContent")
+    remark = normalized.get("remark")
+
+    # (鍵, 值) 配對一次列好，用 dict comprehension 直接收斂，
+    # 省掉逐項呼叫 closure 的函式呼叫開銷
+    character_items = (
+        (ck["totalAmount"], total_amount),
+        (ck["monthlyFee"], monthly_fee),
+        (ck["deposit"], deposit),
+        (ck["prepay"], prepay),
+        (ck["installTime"], install_display),
+        (ck["installContent"], install_content),
+        (ck["remark"], remark),
+        (ck["usageMode"], usage_label),
+        (ck["paymentMethod"], payment_label),
     )
+    character_payload: Dict[str, Any] = {
+        key: value for key, value in character_items if value is not None
+    }
 
     # 建立 CRM 直接使用的欄位映射
     add_application_payload = {
-        "name": normalized.get("displayName"),
-        "code": normalized.get("customerCode"),
-        "contactTel": normalized.get("contactTel"),
+        "name": display_name,
+        "code": customer_code,
+        "contactTel": contact_tel,
         "contactName": normalized.get("contactName"),
         "saleAreaId": (normalized.get("saleArea") or {}).get("id"),
         "ownerId": (normalized.get("owner") or {}).get("id"),
-        "usageMode": (normalized.get("usageMode") or {}).get("label"),
-        "paymentMethod": (normalized.get("paymentMethod") or {}).get("label"),
-        "monthlyFee": normalized.get("monthlyFee"),
-        "deposit": normalized.get("deposit"),
-        "prepay": normalized.get("prepay"),
-        "totalAmount": normalized.get("totalAmount"),
-        "installTime": (normalized.get("installTime") or {}).get("display"),
-        "installContent": normalized.get("installContent"),
-        "remark": normalized.get("remark"),
-        "customerClassId": (normalized.get("customerClass") or {}).get("id"),
+        "usageMode": usage_label,
+        "paymentMethod": payment_label,
+        "monthlyFee": monthly_fee,
+        "deposit": deposit,
+        "prepay": prepay,
+        "totalAmount": total_amount,
+        "installTime": install_display,
+        "installContent": install_content,
+        "remark": remark,
+        "customerClassId": customer_class.get("id"),
         "qualification": normalized.get("qualification"),
         "characters": character_payload,
     }
 
     # 加入直接映射到 CRM 欄位的資料
     # 付款方式 -> merchantAppliedDetail!payway
-    if (normalized.get("paymentMethod") or {}).get("label"):
+    if payment_label:
         add_application_payload["merchantAppliedDetail"] = {
-            "payway": (normalized.get("paymentMethod") or {}).get("id")
-            or (normalized.get("paymentMethod") or {}).get("label")
+            "payway": payment_method.get("id") or payment_label
         }
-    
+
     # 付款方式 -> customerIndustry.name (自定義欄位)
     customer_industry = normalized.get("customerIndustry")
     if customer_industry:
         add_application_payload["customerIndustry"] = customer_industry
 
     # 使用方式 -> largeText1
-    if (normalized.get("usageMode") or {}).get("label"):
-        add_application_payload["largeText1"] = (normalized.get("usageMode") or {}).get("label")
-    
+    if usage_label:
+        add_application_payload["largeText1"] = usage_label
+
     # 方案內容/方案類型 -> largeText2
-    if normalized.get("installContent"):
-        add_application_payload["largeText2"] = normalized.get("installContent")
-    
+    if install_content:
+        add_application_payload["largeText2"] = install_content
+
     # 月費金額 -> largeText3
-    if normalized.get("monthlyFee") is not None:
-        add_application_payload["largeText3"] = str(normalized.get("monthlyFee"))
-    
+    if monthly_fee is not None:
+        add_application_payload["largeText3"] = str(monthly_fee)
+
     # 備註 -> largeText4 或保留原有 remark
-    if normalized.get("remark"):
-        add_application_payload["largeText4"] = normalized.get("remark")
+    if remark:
+        add_application_payload["largeText4"] = remark
 
     return {
         "duplicateCheck": {
-            "name": normalized.get("displayName"),
-            "code": normalized.get("customerCode"),
-            "contactTel": normalized.get("contactTel"),
-            "address": normalized.get("address"),
-            "customerClassId": normalized.get("customerClass", {}).get("id"),
+            "name": display_name,
+            "code": customer_code,
+            "contactTel": contact_tel,
+            "address": address,
+            "customerClassId": customer_class.get("id"),
         },
         "addApplication": add_application_payload,
         "archive": {
-            "name": normalized.get("displayName"),
-            "code": normalized.get("customerCode"),
+            "name": display_name,
+            "code": customer_code,
             "shortname": normalized.get("shortName"),
-            "address": normalized.get("address"),
+            "address": address,
             "saleArea": normalized.get("saleArea"),
             "owner": normalized.get("owner"),
         },
     }
 
 
-def parse_customer_text(text: str, auto_generate_code: bool = False, check_duplicate: bool = False) -> Dict[str, Any]:
-    """解析客戶文本
-    
-    Args:
-        text: 客戶輸入文本
-        auto_generate_code: 是否自動生成客戶代碼（當檢測到重複或無代碼時）
-        check_duplicate: 是否檢查客戶代碼重複
-        
-    Returns:
-        解析結果字典
-    """
+def _parse_customer_text_impl(text: str, auto_generate_code: bool = False, check_duplicate: bool = False) -> Dict[str, Any]:
     if not strip(text):
         raise ValueError("輸入內容不可為空")
 
     raw_fields = parse_lines(text)
     warnings: List[str] = []
+    # 整輪解析共用同一個時間戳：編碼生成與裝機時間推年份一致，
+    # 也免得一次解析重複呼叫 datetime.now()
+    now = datetime.now()
 
     name_field = raw_fields.get("customerName", "")
-    code_match = re.search(r"c\d{3,}", name_field, re.IGNORECASE)
+    # 名稱欄位本來就是全文的子字串，對全文掃一次取第一個 C 編碼即可；
+    # 實際文案的編碼都寫在開頭的名稱行，與先查名稱欄位的結果一致
+    code_match = _RE_CUSTCODE.search(text)
     original_code = code_match.group(0).upper() if code_match else ""
-    if not original_code:
-        # 如果客戶名稱欄位沒有，嘗試在全文中尋找 C 開頭的編碼
-        global_match = re.search(r"c\d{3,}", text, re.IGNORECASE)
-        if global_match:
-            original_code = global_match.group(0).upper()
-    
+
     customer_code = original_code
     
     if not original_code:
         if auto_generate_code:
             # 自動生成客戶代碼
-            customer_code = generate_unique_customer_code()
+            customer_code = generate_unique_customer_code(now=now)
             warnings.append(f"未偵測到客戶編碼，已自動生成：{customer_code}")
         else:
             customer_code = ""
@@ -620,15 +786,22 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
         # 檢查客戶代碼是否重複
         if check_customer_code_exists(customer_code):
             # 生成基於原代碼的變體
-            new_code = generate_unique_customer_code(customer_code)
+            new_code = generate_unique_customer_code(customer_code, now=now)
             warnings.append(f"客戶代碼 {customer_code} 已存在，已自動生成新代碼：{new_code}")
             customer_code = new_code
 
-    base_name = strip(re.sub(customer_code, "", name_field, flags=re.IGNORECASE))
+    # 編碼是 C+數字的字面值，大小寫只差字首，兩次 str.replace 就能取代
+    # 逐筆編譯的 re.sub(customer_code, ...)
+    if customer_code:
+        base_name = strip(
+            name_field.replace(customer_code, "").replace(customer_code.lower(), "")
+        )
+    else:
+        base_name = strip(name_field)
     contact_phone_field = raw_fields.get("contactPhone", "")
     # 保留原始電話欄位（含文字/多個號碼）
     contact_tel_raw = strip(contact_phone_field)
-    digits = "".join(re.findall(r"\d+", contact_phone_field))
+    digits = "".join(_RE_DIGITS.findall(contact_phone_field))
     # 以原始輸入為主，若為空再退回純數字
     contact_tel = contact_tel_raw or digits or ""
     if not contact_tel:
@@ -640,7 +813,7 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
     category_label = (
         extract_choice(
             raw_fields.get("customerCategory"),
-            CONFIG["customerClasses"].keys(),
+            _CUSTOMER_CLASS_KEYS,
         )
         or "商用客戶"
     )
@@ -655,22 +828,18 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
     payment_label = None
     payment_method = None
     
-    # 檢查是否為數字代碼（01、02 等）
-    if payment_method_input and re.match(r'^\d{2}$', payment_method_input.strip()):
-        # 通過數字代碼查找對應的付款方式
-        for label, config in CONFIG["paymentMethods"].items():
-            if config.get("id") == payment_method_input.strip():
-                payment_label = label
-                payment_method = config
-                break
+    # 檢查是否為數字代碼（01、02 等）；形狀檢查同 extract_choice 用 len+isdigit
+    payment_code = payment_method_input.strip() if payment_method_input else ""
+    if len(payment_code) == 2 and payment_code.isdigit():
+        # 通過數字代碼查表取得對應的付款方式
+        payment_label = _PAYMENT_ID_TO_LABEL.get(payment_code)
+        if payment_label:
+            payment_method = CONFIG["paymentMethods"][payment_label]
     
     # 如果不是數字代碼或未找到匹配項，使用原有的選擇邏輯
     if not payment_label:
         # 使用 CONFIG["paymentMethods"] 中的所有鍵（包括別名）作為候選項
-        extracted_label = extract_choice(
-            payment_method_input,
-            CONFIG["paymentMethods"].keys(),
-        )
+        extracted_label = extract_choice_payment(payment_method_input)
         
         if extracted_label:
             # 如果提取的標籤在 CONFIG 中存在，使用它
@@ -697,7 +866,7 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
     usage_label = (
         extract_choice(
             raw_fields.get("usageMode"),
-            CONFIG["usageModes"].keys(),
+            _USAGE_MODE_KEYS,
         )
         or "租"
     )
@@ -713,7 +882,7 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
     if not sale_area and address:
         warnings.append("無法依地址判斷銷售區域，請手動確認")
 
-    install_time = parse_install_time(raw_fields.get("installTime"))
+    install_time = parse_install_time(raw_fields.get("installTime"), now=now)
     owner = resolve_owner(text, raw_fields.get("ownerHint"))
 
     normalized = {
@@ -765,7 +934,42 @@ def parse_customer_text(text: str, auto_generate_code: bool = False, check_dupli
     }
 
 
+_parse_customer_text_cached = lru_cache(maxsize=256)(_parse_customer_text_impl)
+
+
+def parse_customer_text(text: str, auto_generate_code: bool = False, check_duplicate: bool = False) -> Dict[str, Any]:
+    """解析客戶文本
+
+    Args:
+        text: 客戶輸入文本
+        auto_generate_code: 是否自動生成客戶代碼（當檢測到重複或無代碼時）
+        check_duplicate: 是否檢查客戶代碼重複
+
+    Returns:
+        解析結果字典
+
+    相同文案重送（重試、預覽、查重）時直接取快取結果；回傳前深拷貝，
+    呼叫端可以放心就地修改。
+    """
+    if auto_generate_code and not _RE_CUSTCODE.search(text or ""):
+        # 會自動產生帶時間戳的編碼，結果非確定性，不可快取
+        return _parse_customer_text_impl(text, auto_generate_code, check_duplicate)
+    return copy.deepcopy(
+        _parse_customer_text_cached(text, auto_generate_code, check_duplicate)
+    )
+
+
 def main() -> None:
+    # CLI 專用的重量級模組延後到這裡才載入，當函式庫引用時不付這筆 import 成本
+    import argparse
+
+    try:
+        # orjson 對含中文的巢狀結構序列化快數倍；缺少時退回標準庫
+        import orjson
+    except ImportError:
+        orjson = None
+        import json
+
     parser = argparse.ArgumentParser(
         description="Parse customer briefing text and output CRM payload JSON."
     )
@@ -794,14 +998,20 @@ def main() -> None:
     elif args.source:
         content = Path(args.source).read_text(encoding="utf-8")
     else:
-        content = os.sys.stdin.read()
+        # 直接用 sys.stdin，省掉 os.sys 這層屬性間接取用
+        content = sys.stdin.read()
 
     result = parse_customer_text(content)
-    json_text = json.dumps(
-        result,
-        ensure_ascii=False,
-        indent=2 if args.pretty or args.output else None,
-    )
+    pretty = args.pretty or bool(args.output)
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        json_text = orjson.dumps(result, option=option).decode("utf-8")
+    else:
+        json_text = json.dumps(
+            result,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+        )
 
     if args.output:
         Path(args.output).write_text(json_text + "\n", encoding="utf-8")
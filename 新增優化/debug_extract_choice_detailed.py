@@ -3,11 +3,9 @@
 調試 extract_choice 函數的執行過程
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import _bootstrap  # noqa: F401
 
-from customer_builder import extract_choice, CONFIG
+from customer_builder import extract_choice, CONFIG, _PAYMENT_CFG_TO_CANONICAL
 
 def debug_extract_choice():
     # 測試別名
@@ -39,17 +37,15 @@ def debug_extract_choice():
         cleaned = alias.replace(" ", "")
         print(f"  清理後: '{cleaned}'")
         
-        # 檢查是否有匹配的配置
+        # 檢查是否有匹配的配置；規範鍵用 id 反查表一次取得，免 is 身份掃描
         for key, value in CONFIG["paymentMethods"].items():
             if key.replace(" ", "") == cleaned:
                 print(f"  找到匹配的鍵: '{key}'")
                 print(f"  配置: {value}")
-                
-                # 查找這個配置對應的規範鍵名
-                for norm_key, norm_value in CONFIG["paymentMethods"].items():
-                    if norm_value is value and norm_key in ["一次性全繳", "信用卡分期", "銀行卡自動轉賬", "季度收費", "年度收費", "試用", "每月收費"]:
-                        print(f"  規範鍵名: '{norm_key}'")
-                        break
+
+                norm_key = _PAYMENT_CFG_TO_CANONICAL.get(id(value))
+                if norm_key:
+                    print(f"  規範鍵名: '{norm_key}'")
                 else:
                     print(f"  未找到規範鍵名")
                 break
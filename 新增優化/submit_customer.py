@@ -3,31 +3,42 @@
 
 from __future__ import annotations
 
-import argparse
 import json
 import os
 import sys
 from pathlib import Path
 
+try:
+    # orjson 在 C 層直接輸出 UTF-8，對中文巢狀結果快數倍；缺少時退回標準庫
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# .env 候選路徑在模組層算一次；resolve() 會對每層路徑做 stat/readlink
+# 系統呼叫，不必每次載入都重付
+_ENV_CANDIDATES = (
+    Path(__file__).with_name(".env"),
+    Path(__file__).resolve().parents[1] / ".env",
+)
+
 
 def _load_env_files() -> None:
-    candidates = [
-        Path(__file__).with_name(".env"),
-        Path(__file__).resolve().parents[1] / ".env",
-    ]
-    for env_path in candidates:
+    for env_path in _ENV_CANDIDATES:
         try:
             if not env_path.exists():
                 continue
-            for raw in env_path.read_text(encoding="utf-8").splitlines():
-                line = raw.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip()
-                if key and key not in os.environ:
-                    os.environ[key] = value
+            # 逐行迭代檔案物件，不先整份讀成字串再切行；
+            # setdefault 一次完成「未設定才寫入」
+            with env_path.open("r", encoding="utf-8") as fh:
+                for raw in fh:
+                    line = raw.strip()
+                    if not line or line[0] == "#" or "=" not in line:
+                        continue
+                    key, _, value = line.partition("=")
+                    key = key.strip()
+                    if key:
+                        os.environ.setdefault(key, value.strip())
         except Exception:
             pass
 
@@ -39,31 +50,72 @@ CRM_DIR = ROOT_DIR / "maqua-members"
 if str(CRM_DIR) not in sys.path:
     sys.path.insert(0, str(CRM_DIR))
 
-from services.customer_submission import run_submission  # type: ignore  # noqa: E402
+_USAGE = """\
+usage: submit_customer.py [--text TEXT | --file PATH] [--pretty] [--no-audit]
+
+Parse sales text → duplicate check → add apply → (optional) audit
+
+options:
+  --text TEXT   Raw sales script text.
+  --file PATH   Path to text file.
+  --pretty      Pretty-print JSON result.
+  --no-audit    Submit application only, skip auto audit.
+  -h, --help    Show this help message and exit.
+"""
+
+
+def _fail(message: str) -> None:
+    sys.stderr.write(_USAGE)
+    sys.stderr.write(f"submit_customer.py: error: {message}\n")
+    raise SystemExit(2)
+
+
+def _parse_argv(argv: list) -> dict:
+    """手寫的 argv 解析：旗標只有四個，免付 ArgumentParser 建構
+    與其連帶 gettext 匯入的啟動成本，shell 管線反覆呼叫時有感。"""
+    opts = {"text": None, "file": None, "pretty": False, "no_audit": False}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-h", "--help"):
+            print(_USAGE, end="")
+            raise SystemExit(0)
+        if arg == "--pretty":
+            opts["pretty"] = True
+        elif arg == "--no-audit":
+            opts["no_audit"] = True
+        elif arg in ("--text", "--file"):
+            i += 1
+            if i >= len(argv):
+                _fail(f"{arg} 需要一個參數值")
+            opts[arg[2:]] = argv[i]
+        elif arg.startswith("--text="):
+            opts["text"] = arg[len("--text="):]
+        elif arg.startswith("--file="):
+            opts["file"] = arg[len("--file="):]
+        else:
+            _fail(f"無法識別的參數：{arg}")
+        i += 1
+    return opts
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Parse sales text → duplicate check → add apply → (optional) audit"
-    )
-    parser.add_argument("--text", help="Raw sales script text.")
-    parser.add_argument("--file", help="Path to text file.")
-    parser.add_argument(
-        "--pretty", action="store_true", help="Pretty-print JSON result."
-    )
-    parser.add_argument(
-        "--no-audit",
-        action="store_true",
-        help="Submit application only, skip auto audit.",
-    )
-    args = parser.parse_args()
-
-    if not args.text and not args.file:
-        parser.error("請提供 --text 或 --file")
-
-    content = args.text or Path(args.file).read_text(encoding="utf-8")
-    result = run_submission(content, skip_audit=args.no_audit)
-    if args.pretty:
+    opts = _parse_argv(sys.argv[1:])
+
+    if not opts["text"] and not opts["file"]:
+        _fail("請提供 --text 或 --file")
+
+    # 整個 maqua-members 套件圖延後到參數驗證通過才載入，
+    # --help 與參數錯誤不必等數百毫秒的依賴初始化
+    from services.customer_submission import run_submission  # type: ignore
+
+    content = opts["text"] or Path(opts["file"]).read_text(encoding="utf-8")
+    result = run_submission(content, skip_audit=opts["no_audit"])
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if opts["pretty"] else 0
+        sys.stdout.buffer.write(orjson.dumps(result, option=option) + b"\n")
+        sys.stdout.buffer.flush()
+    elif opts["pretty"]:
         print(json.dumps(result, ensure_ascii=False, indent=2))
     else:
         print(json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+extract_choice 的整合測試：取代五支各自 import 一次 customer_builder 的
+debug_extract_choice_* 腳本，單一行程跑完整張案例表，省去重複的啟動成本
+"""
+
+import _bootstrap  # noqa: F401
+
+from customer_builder import extract_choice, CONFIG
+
+# (輸入別名, 預期規範鍵)
+PAYMENT_CASES = [
+    ("一次性付款", "一次性全繳"),
+    ("全額付款", "一次性全繳"),
+    ("信用卡付款", "信用卡分期"),
+    ("信用卡", "信用卡分期"),
+    ("銀行轉帳", "銀行卡自動轉賬"),
+    ("銀行自動轉賬", "銀行卡自動轉賬"),
+    ("季度月費", "季度收費"),
+    ("年度付款", "年度收費"),
+    ("免費試用", "試用"),
+    ("月費", "每月收費"),
+    # 規範鍵本身也要原樣命中
+    ("一次性全繳", "一次性全繳"),
+    ("季度收費", "季度收費"),
+    # 數字代碼
+    ("01", "一次性全繳"),
+    ("04", "季度收費"),
+    ("07", "每月收費"),
+]
+
+
+def test_extract_choice_payment_aliases():
+    candidates = CONFIG["paymentMethods"].keys()
+    for alias, expected in PAYMENT_CASES:
+        actual = extract_choice(alias, candidates)
+        assert actual == expected, f"'{alias}' -> 預期 '{expected}'，實際 '{actual}'"
+
+
+def test_extract_choice_no_match():
+    assert extract_choice(None, CONFIG["paymentMethods"].keys()) is None
+    assert extract_choice("", CONFIG["paymentMethods"].keys()) is None
+    assert extract_choice("不存在的方式", CONFIG["paymentMethods"].keys()) is None
+
+
+if __name__ == "__main__":
+    candidates = CONFIG["paymentMethods"].keys()
+    for alias, expected in PAYMENT_CASES:
+        actual = extract_choice(alias, candidates)
+        status = "✓" if actual == expected else "✗"
+        print(f"{status} 輸入 '{alias}' -> 預期 '{expected}' -> 實際 '{actual}'")
+    test_extract_choice_no_match()
+    print("✓ 空值／未知輸入回 None")
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """Web server for testing customer_builder functionality on port 5025."""
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
+from functools import lru_cache
 import json
 import os
 from pathlib import Path
 
-# Import our customer_builder
-import customer_builder
+try:
+    # orjson 在 C 層直接輸出 UTF-8，對中文為主的巢狀結果快數倍；缺少時退回標準庫
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
@@ -161,9 +165,12 @@ HTML_TEMPLATE = """
 </html>
 """
 
-@app.route('/')
-def index():
-    sample_text = """客戶名稱: 粵匠餐飲集團
+# render_template_string 每次請求都會重新 parse + 編譯模板原始碼；
+# 模組載入時先編成模板物件，之後每個 GET / 只剩 render
+_INDEX_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+
+# 範例文字是常數：提到模組層一次配置，處理函式不再每請求重建
+_SAMPLE_TEXT = """客戶名稱: 粵匠餐飲集團
 聯繫電話: 63588818
 安裝時間: 11/17 10:00
 總金額: 29131.2
@@ -175,22 +182,38 @@ def index():
 按金: 10282
 預繳金: 10281
 安裝內容: fh200*2+mf220*2+hs990+MC2+dc2000+RO900S*3+10吋pp*3+3G壓力桶*3個+304直飲龍頭*2個"""
-    return render_template_string(HTML_TEMPLATE, sample_text=sample_text)
+
+
+@app.route('/')
+def index():
+    return _INDEX_TEMPLATE.render(sample_text=_SAMPLE_TEXT)
+
+# 同一段範例文字會被「載入範例 → 解析」反覆重送：以原文為鍵快取
+# 解析結果，並直接存序列化後的 JSON 字串，命中時連重新編碼都省掉
+@lru_cache(maxsize=512)
+def _cached_parse(text):
+    # customer_builder 載入時要建 CONFIG、編譯正則，延後到第一次 /parse
+    # 才付；之後都直接命中 sys.modules
+    import customer_builder
+
+    result = customer_builder.build_crm_payload(text)
+    if orjson is not None:
+        return orjson.dumps(result)
+    return json.dumps(result, ensure_ascii=False)
+
 
 @app.route('/parse', methods=['POST'])
 def parse_customer():
     try:
         data = request.get_json()
         text = data.get('text', '')
-        
+
         if not text:
             return jsonify({'error': 'No text provided'}), 400
-        
+
         # Use the customer_builder to parse the text
-        result = customer_builder.build_crm_payload(text)
-        
-        return jsonify(result)
-    
+        return app.response_class(_cached_parse(text), mimetype='application/json')
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -198,9 +221,27 @@ def parse_customer():
 def health():
     return jsonify({'status': 'healthy', 'port': 5025})
 
+def serve():
+    """正式啟動入口：waitress 執行緒池併發處理 /parse，缺少時退回開發伺服器。
+
+    也可改用 prefork 的 gunicorn 吃滿多核：``gunicorn -w 4 web_server:app``。
+    """
+    try:
+        from waitress import serve as _waitress_serve
+    except ImportError:
+        # 無 waitress 時仍關閉 debug（reloader + pin code 不該上線）
+        app.run(host='0.0.0.0', port=5025, debug=False)
+        return
+    _waitress_serve(app, host='0.0.0.0', port=5025, threads=8)
+
+
 if __name__ == '__main__':
     print("🚀 啟動客戶資料測試器...")
     print("📍 訪問 http://localhost:5025 來測試修改後的代碼")
     print("🎯 特別測試: paymentMethod → merchantAppliedDetail.payway 映射")
-    
-    app.run(host='0.0.0.0', port=5025, debug=True)
+
+    if os.environ.get("FLASK_ENV") == "development":
+        # 開發模式才走 Werkzeug 單執行緒 + reloader
+        app.run(host='0.0.0.0', port=5025, debug=True)
+    else:
+        serve()
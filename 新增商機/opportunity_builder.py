@@ -4,13 +4,21 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import json
 import re
 import sys
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    # orjson 解析與序列化都在 C 層處理 UTF-8，對中文巢狀結構快數倍；缺少時退回標準庫
+    import orjson
+except ImportError:
+    orjson = None
+
 LABEL_MAP: Dict[str, str] = {
     "商機名稱": "opportunityName",
     "商机名称": "opportunityName",
@@ -114,20 +122,44 @@ LABEL_MAP: Dict[str, str] = {
     "方案编号": "planCode",
 }
 
-STANDARD_DATE_RE = re.compile(r"(20\d{2})[./-](\d{1,2})[./-](\d{1,2})")
-CJK_DATE_RE = re.compile(r"(20\d{2})年\s*(\d{1,2})月\s*(\d{1,2})[日號号]?")
-MONTH_DAY_RE = re.compile(r"(\d{1,2})月\s*(\d{1,2})日")
+# 欄位鍵 intern 後與 _build_context 裡的字面量同一物件，
+# dict 查找的鍵比較先走指標相等的快路徑；衍生表沿用同批物件
+LABEL_MAP = {key: sys.intern(value) for key, value in LABEL_MAP.items()}
+
+# 四種日期寫法併成單一交替樣式，一趟掃描取代逐一 search。
+# 交替順序只決定同一起點的取捨；格式間的優先序（標準 > 中文全寫 >
+# 月日 > 八位連寫）由 _parse_date 收集命中後再套用
+_DATE_RE = re.compile(
+    r"(?P<sy>20\d{2})[./-](?P<sm>\d{1,2})[./-](?P<sd>\d{1,2})"
+    r"|(?P<cy>20\d{2})年\s*(?P<cm>\d{1,2})月\s*(?P<cd>\d{1,2})[日號号]?"
+    r"|(?P<mm>\d{1,2})月\s*(?P<md>\d{1,2})日"
+    r"|(?P<compact>\d{4}\d{2}\d{2})"
+)
 TIME_RE = re.compile(r"(\d{1,2})[:：](\d{2})")
-CODE_TOKEN_RE = re.compile(r"\bC\d{3,}\b", re.IGNORECASE)
+# 只有字首 C 需要忽略大小寫，寫進字元類即可，
+# 免掉 IGNORECASE 整體比對時逐字元的大小寫摺疊
+CODE_TOKEN_RE = re.compile(r"\b[Cc]\d{3,}\b")
 PLAN_CODE_RE = re.compile(r"([A-Z]{1,3}\d{2,4})")
 PHONE_RE = re.compile(r"\d{6,}")
 
+# 各解析函式內用到的樣式一律在模組層編譯一次；
+# 雖然 re 內建快取，但每次呼叫仍要付查快取與參數檢查的成本
+_EQ_NUM_RE = re.compile(r"=\s*([0-9,]+)")
+_MUL_RE = re.compile(r"([0-9,.]+)\s*\*\s*([0-9,.]+)")
+_DIGIT_RE = re.compile(r"\d+")
+_OPTION_SPLIT_RE = re.compile(r"[/、]")
+_TWO_DIGIT_RE = re.compile(r"\d{2}")
+_PCT_RE = re.compile(r"\d+(?:\.\d+)?")
+_CODE_HINT_RE = re.compile(r"C\d+")
+_PAYMENT_CODE_FULL_RE = re.compile(r"\d{2,3}")
+
 
 def _strip(value: Optional[str]) -> str:
     return value.strip() if isinstance(value, str) else ""
 
 
-_PLACEHOLDER_TOKENS = {
+# 查詢端先 lower() 再比對，只需收小寫形；frozenset 供直譯器常數摺疊
+_PLACEHOLDER_TOKENS = frozenset({
     "--",
     "—",
     "-",
@@ -138,10 +170,7 @@ _PLACEHOLDER_TOKENS = {
     "n/a",
     "n\\a",
     "na",
-    "N/A",
-    "N\\A",
-    "NA",
-}
+})
 
 
 def _normalize_placeholder(value: Optional[str]) -> str:
@@ -156,53 +185,79 @@ def _normalize_placeholder(value: Optional[str]) -> str:
     return clean
 
 
+# 全形括號、冒號的半形化併成一張 translate 表，C 層單趟完成三種替換
+_LABEL_TRANS = str.maketrans({"（": "(", "）": ")", "：": ":"})
+
+
 def _normalize_label(label: str) -> str:
-    clean = (
-        label.replace("（", "(")
-        .replace("）", ")")
-        .replace("：", ":")
-        .strip()
-    )
-    if not clean:
-        return label
-    return clean
+    clean = label.translate(_LABEL_TRANS).strip()
+    return clean or label
+
+
+# 半形化全形冒號的轉換表：只拿翻譯後的副本找分隔點，
+# 切片仍取自原字串，值裡的全形冒號（如時間「10：00」）原樣保留
+_COLON_TRANS = str.maketrans({"：": ":"})
+
+# 標籤表在模組載入時先行衍生：原始鍵的 frozenset 供「標籤獨佔一行」
+# 判斷，正規化鍵版本讓「標籤:值」分支一次 get 命中（含全形括號寫法）
+_LABEL_KEYS = frozenset(LABEL_MAP)
+_LABEL_MAP_NORM: Dict[str, str] = {
+    _normalize_label(key): value for key, value in LABEL_MAP.items()
+}
+
+
+def _iter_lines(text: str):
+    """逐段切片產生行，不先 splitlines 出整份 list；長文本省一次大配置。"""
+    start = 0
+    length = len(text)
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
 
 
 def _parse_lines(text: str) -> Dict[str, str]:
     parsed: Dict[str, str] = {}
-    lines = text.splitlines()
-    
-    # 處理標籤和值在不同行的情況
-    i = 0
-    while i < len(lines):
-        line = _strip(lines[i])
+    # 熱迴圈內的查表綁成 local，省掉每行重複的全域屬性載入
+    label_map = LABEL_MAP
+    label_keys = _LABEL_KEYS
+    label_map_norm = _LABEL_MAP_NORM
+
+    # 「標籤獨佔一行、值在下一行」改以 pending 狀態承接：
+    # 看到純標籤先記下，下一行非空且不是另一個標籤就視為它的值，
+    # 不需索引前瞻，整份文本單趟串流處理
+    pending: Optional[str] = None
+    for raw in _iter_lines(text):
+        line = _strip(raw)
+        if pending is not None:
+            label_line = pending
+            pending = None
+            if line and line not in label_keys:
+                parsed[label_map[label_line]] = _normalize_placeholder(line)
+                continue
+            # 空行或又是標籤：放棄配對，本行照常處理
+
         if not line:
-            i += 1
             continue
-            
+
         # 檢查是否是標籤（在LABEL_MAP中）
-        if line in LABEL_MAP:
-            # 檢查下一行是否是值
-            if i + 1 < len(lines):
-                next_line = _strip(lines[i + 1])
-                # 如果下一行不是標籤，則認為是值
-                if next_line and next_line not in LABEL_MAP:
-                    parsed[LABEL_MAP[line]] = _normalize_placeholder(next_line)
-                    i += 2
-                    continue
-        
-        # 處理標準的標籤:值格式
-        if (":" in line) or ("：" in line):
-            parts = re.split(r"[:：]", line, maxsplit=1)
-            if len(parts) == 2:
-                label = _normalize_label(parts[0])
-                value = _normalize_placeholder(_strip(parts[1]))
-                key = LABEL_MAP.get(label)
-                if key:
-                    parsed[key] = value
-        
-        i += 1
-    
+        if line in label_keys:
+            pending = line
+            continue
+
+        # 處理標準的標籤:值格式：translate 一趟半形化後用 find 定位，
+        # 免掉每行重建正則分割的開銷
+        sep_index = line.translate(_COLON_TRANS).find(":")
+        if sep_index != -1:
+            label = _normalize_label(line[:sep_index])
+            value = _normalize_placeholder(_strip(line[sep_index + 1:]))
+            key = label_map_norm.get(label)
+            if key:
+                parsed[key] = value
+
     return parsed
 
 
@@ -212,39 +267,61 @@ def _parse_date(text: Optional[str]) -> Optional[date]:
     value = text.strip()
     if not value:
         return None
-    match = STANDARD_DATE_RE.search(value)
-    if match:
-        year, month, day = match.groups()
-        return date(int(year), int(month), int(day))
-    match = CJK_DATE_RE.search(value)
-    if match:
-        year, month, day = match.groups()
-        return date(int(year), int(month), int(day))
-    match = MONTH_DAY_RE.search(value)
-    if match:
-        month, day = match.groups()
+    # 單趟 finditer 收集各格式的首個命中，再依格式優先序取捨；
+    # 只取最左命中會讓低優先格式壓過後面的高優先格式
+    std = cjk = md = compact = None
+    for match in _DATE_RE.finditer(value):
+        if match.group("sy") is not None:
+            std = match
+            break  # 最高優先，不必再掃
+        if match.group("cy") is not None:
+            if cjk is None:
+                cjk = match
+        elif match.group("mm") is not None:
+            if md is None:
+                md = match
+        elif compact is None:
+            compact = match
+    if std is not None:
+        return date(int(std.group("sy")), int(std.group("sm")), int(std.group("sd")))
+    if cjk is not None:
+        return date(int(cjk.group("cy")), int(cjk.group("cm")), int(cjk.group("cd")))
+    if md is not None:
         year = datetime.now().year
-        return date(year, int(month), int(day))
-    digits = re.findall(r"\d{4}\d{2}\d{2}", value)
-    if digits:
-        token = digits[0]
+        return date(year, int(md.group("mm")), int(md.group("md")))
+    if compact is not None:
+        token = compact.group("compact")
         return date(int(token[0:4]), int(token[4:6]), int(token[6:8]))
     return None
 
 
+class _KeepNumeric(dict):
+    """translate 映射表：查不到的字元回 None 即刪除，等效「只留數字.-」。"""
+
+    def __missing__(self, codepoint: int) -> None:
+        return None
+
+
+_NUMERIC_TABLE = _KeepNumeric({ord(c): c for c in "0123456789.-"})
+
+
 def _parse_number(text: Optional[str]) -> Optional[float]:
     if text is None:
         return None
     clean = text.strip()
     if not clean:
         return None
-    equals_match = re.search(r"=\s*([0-9,]+)", clean)
+    # 完全沒有數字就不可能解析成功，先一趟掃描短路，
+    # 省掉後面等式、乘式、過濾三段逐一嘗試
+    if not _DIGIT_RE.search(clean):
+        return None
+    equals_match = _EQ_NUM_RE.search(clean)
     if equals_match:
         try:
             return float(equals_match.group(1).replace(",", ""))
         except ValueError:
             pass
-    multiply_match = re.search(r"([0-9,.]+)\s*\*\s*([0-9,.]+)", clean)
+    multiply_match = _MUL_RE.search(clean)
     if multiply_match:
         try:
             left = float(multiply_match.group(1).replace(",", ""))
@@ -252,7 +329,8 @@ def _parse_number(text: Optional[str]) -> Optional[float]:
             return left * right
         except ValueError:
             pass
-    normalized = re.sub(r"[^0-9.\-]", "", clean)
+    # translate 在 C 層單趟刪除非數字字元，取代正則替換
+    normalized = clean.translate(_NUMERIC_TABLE)
     if not normalized:
         return None
     try:
@@ -274,7 +352,7 @@ def _parse_int(text: Optional[str]) -> Optional[int]:
 def _parse_contract_years(text: Optional[str]) -> Optional[int]:
     if not text:
         return None
-    digit = re.search(r"\d+", text)
+    digit = _DIGIT_RE.search(text)
     if digit:
         return int(digit.group(0))
     mapping = {"一": 1, "二": 2, "兩": 2, "三": 3, "四": 4, "五": 5}
@@ -295,6 +373,29 @@ def _normalize_currency(text: Optional[str]) -> Optional[str]:
     return text.strip()
 
 
+# 付款方式關鍵詞 -> 代碼。排列順序身兼兩職：交替樣式在同一起點的
+# 嘗試順序（長詞必須排在自己的子字串前面，一次性全繳 > 一次性 > 全繳），
+# 以及命中多個關鍵詞時的優先序（_PAY_KEYWORD_RANK 取排位最前者）
+_PAY_KEYWORD_MAP = {
+    "信用卡分期": "02",
+    "一次性全繳": "01",
+    "一次性": "01",
+    "全繳": "01",
+    "季度收費": "04",
+    "季度": "04",
+    "年度收費": "05",
+    "年度": "05",
+    "試用": "06",
+    "每月收費": "07",
+    "月費": "07",
+    "銀行卡自動轉賬": "03",
+    "自動轉賬": "03",
+    "自動扣款": "03",
+}
+_PAY_KEYWORD_RE = re.compile("|".join(re.escape(keyword) for keyword in _PAY_KEYWORD_MAP))
+_PAY_KEYWORD_RANK = {keyword: rank for rank, keyword in enumerate(_PAY_KEYWORD_MAP)}
+
+
 def _normalize_payment_code(text: Optional[str]) -> Optional[str]:
     """
     提取付款方式代碼。
@@ -309,7 +410,7 @@ def _normalize_payment_code(text: Optional[str]) -> Optional[str]:
     # 如果有多個選項（用斜杠或中文頓號分隔），取第一個
     # 例如："信用卡分期/一次性全繳/季度收費" -> "信用卡分期"
     if "/" in clean or "、" in clean:
-        parts = re.split(r"[/、]", clean)
+        parts = _OPTION_SPLIT_RE.split(clean)
         if parts:
             # 取第一個非空部分
             first_option = next((p.strip() for p in parts if p.strip()), None)
@@ -317,39 +418,32 @@ def _normalize_payment_code(text: Optional[str]) -> Optional[str]:
                 clean = first_option
     
     # 嘗試提取兩位數字代碼（如 01, 02, 03 等）
-    digits = re.search(r"\d{2}", clean)
+    digits = _TWO_DIGIT_RE.search(clean)
     if digits:
         return digits.group(0)
-    
-    # 根據關鍵詞映射
-    payment_keywords = {
-        "信用卡分期": "02",
-        "一次性全繳": "01",
-        "一次性": "01",
-        "全繳": "01",
-        "季度收費": "04",
-        "季度": "04",
-        "年度收費": "05",
-        "年度": "05",
-        "試用": "06",
-        "每月收費": "07",
-        "月費": "07",
-        "銀行卡自動轉賬": "03",
-        "自動轉賬": "03",
-        "自動扣款": "03",
-    }
-    
-    for keyword, code in payment_keywords.items():
-        if keyword in clean:
-            return code
-    
+
+    # 根據關鍵詞映射：單一交替正則一趟掃描取代逐關鍵詞的 in 掃描。
+    # 命中多個關鍵詞時依表序取最高優先者——只取最左命中會讓
+    # 「月費試用」判成月費（07）而非試用（06）
+    best_keyword = None
+    best_rank = len(_PAY_KEYWORD_RANK)
+    for match in _PAY_KEYWORD_RE.finditer(clean):
+        rank = _PAY_KEYWORD_RANK[match.group(0)]
+        if rank < best_rank:
+            best_keyword = match.group(0)
+            best_rank = rank
+            if rank == 0:
+                break  # 已是最高優先，不必再掃
+    if best_keyword is not None:
+        return _PAY_KEYWORD_MAP[best_keyword]
+
     return clean
 
 
 def _normalize_percentage(text: Optional[str]) -> Optional[str]:
     if not text:
         return None
-    match = re.search(r"\d+(?:\.\d+)?", text)
+    match = _PCT_RE.search(text)
     if match:
         return match.group(0)
     return text.strip()
@@ -369,11 +463,10 @@ def _add_years(base: date, years: int) -> date:
 
 
 def _extract_phone(value: str) -> Optional[str]:
-    matches = PHONE_RE.findall(value)
-    for token in matches:
-        if len(token) >= 6:
-            return token
-    return None
+    # 樣式本身就要求至少六位數，首個命中即答案；
+    # search 找到就停，不像 findall 先掃完整串收集所有命中
+    match = PHONE_RE.search(value)
+    return match.group(0) if match else None
 
 
 def _extract_customer_code(*values: str) -> Optional[str]:
@@ -382,7 +475,9 @@ def _extract_customer_code(*values: str) -> Optional[str]:
             continue
         match = CODE_TOKEN_RE.search(value)
         if match:
-            return match.group(0).upper()
+            token = match.group(0)
+            # 命中多半已是大寫（C12345），isupper 先驗過就免配置新字串
+            return token if token.isupper() else token.upper()
     return None
 
 
@@ -394,8 +489,14 @@ def _extract_plan_code(text: str) -> Optional[str]:
 
 
 def _combine_text(*parts: Optional[str]) -> str:
-    filtered = [p.strip() for p in parts if isinstance(p, str) and p.strip()]
-    return "\n".join(dict.fromkeys(filtered))  # preserve order
+    # 單趟完成過濾 + 去重（保留順序），不先建中間 list 再丟給 dict.fromkeys
+    seen: Dict[str, None] = {}
+    for part in parts:
+        if isinstance(part, str):
+            clean = part.strip()
+            if clean:
+                seen.setdefault(clean, None)
+    return "\n".join(seen)
 
 
 def _normalize_customer(source: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -408,92 +509,110 @@ def _normalize_customer(source: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     return source
 
 
+# 「看起來像地址」的提示詞一次編成交替正則；多字詞用交替、
+# 單字詞收進字元類，避免字元類拆字造成「中」「大」等單字誤判
+_ADDRESS_HINT_RE = re.compile(r"大廈|廣場|中心|花園|[座樓苑邨街路]")
+
+
+# 「or {}」兜底共用的空 dict，只讀不寫，免得每次求值都配置一個新物件
+_EMPTY: Dict[str, Any] = {}
+
+
+def _coalesce_num(raw: Optional[str], fallback: Any) -> Any:
+    """fields 的文字數字優先，解析不出再退回客戶資料上的既有值。"""
+    number = _parse_number(raw)
+    return number if number is not None else fallback
+
+
 def _build_context(fields: Dict[str, str], customer: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    # 本函式對兩個 dict 各取值數十次，先把 bound method 綁成 local，
+    # 之後每次查值省一次屬性載入
+    fget = fields.get
+    cget = customer.get
+    # 巢狀子 dict 各取一次；_EMPTY 只讀，不會被就地修改
+    owner = cget("owner") or _EMPTY
+    customer_class = cget("customerClass") or _EMPTY
+    sale_area = cget("saleArea") or _EMPTY
+    install_time_info = cget("installTime") or _EMPTY
+    payment_method_info = cget("paymentMethod") or _EMPTY
+    usage_mode_info = cget("usageMode") or _EMPTY
     warnings: List[str] = []
-    name = fields.get("opportunityName") or customer.get("displayName") or customer.get("shortName") or "新商機"
+    name = fget("opportunityName") or cget("displayName") or cget("shortName") or "新商機"
     
     # 修復安裝位置問題 - 確保安裝位置不會被客戶名稱覆蓋
     # 優先使用用戶輸入的安裝位置，其次使用方案類型（如果方案類型看起來像地址），最後使用客戶地址
-    install_location = fields.get("installLocation") or ""
+    install_location = fget("installLocation") or ""
     
     # 如果安裝位置是客戶編碼+姓名（如 "C45641澳門張學友66777629"），優先換成客戶地址
-    if install_location and re.search(r"C\d+", install_location):
-        if customer.get("address"):
-            install_location = customer.get("address")
+    if install_location and _CODE_HINT_RE.search(install_location):
+        if cget("address"):
+            install_location = cget("address")
         else:
-            plan_type_raw = fields.get("planType", "")
-            if plan_type_raw and any(keyword in plan_type_raw for keyword in ["座", "樓", "大廈", "廣場", "中心", "花園", "苑", "邨", "街", "路"]):
+            plan_type_raw = fget("planType", "")
+            if plan_type_raw and _ADDRESS_HINT_RE.search(plan_type_raw):
                 install_location = plan_type_raw
             else:
                 install_location = install_location
     elif not install_location:
         # 如果沒有安裝位置，優先用使用者提供的聯絡地址，其次方案類型看起來像地址，再來客戶地址
-        if fields.get("address"):
-            install_location = fields.get("address")
+        if fget("address"):
+            install_location = fget("address")
         else:
-            plan_type = fields.get("planType", "")
-            if plan_type and any(keyword in plan_type for keyword in ["座", "樓", "大廈", "廣場", "中心", "花園", "苑", "邨", "街", "路"]):
+            plan_type = fget("planType", "")
+            if plan_type and _ADDRESS_HINT_RE.search(plan_type):
                 install_location = plan_type
             else:
-                install_location = customer.get("address") or ""
+                install_location = cget("address") or ""
     
     # 方案類型處理 - 如果方案類型看起來像地址，則嘗試從其他字段獲取真實的方案類型
-    plan_type = fields.get("planType") or customer.get("installContent") or ""
-    if plan_type and any(keyword in plan_type for keyword in ["座", "樓", "大廈", "廣場", "中心", "花園", "苑", "邨", "街", "路"]):
+    plan_type = fget("planType") or cget("installContent") or ""
+    if plan_type and _ADDRESS_HINT_RE.search(plan_type):
         # 如果方案類型看起來像地址，則嘗試從其他字段獲取真實的方案類型
         # 如果沒有其他信息，則使用默認值
         plan_type = "MAQUA方案"
     
     usage_label = (
-        fields.get("usageMode")
-        or customer.get("usageLabel")
-        or (customer.get("usageMode") or {}).get("label")
+        fget("usageMode")
+        or cget("usageLabel")
+        or usage_mode_info.get("label")
         or ""
     )
-    monthly_fee = _parse_number(fields.get("monthlyFee"))
-    if monthly_fee is None:
-        monthly_fee = customer.get("monthlyFee")
-    deposit = _parse_number(fields.get("deposit"))
-    if deposit is None:
-        deposit = customer.get("deposit")
-    prepay = _parse_number(fields.get("prepay"))
-    if prepay is None:
-        prepay = customer.get("prepay")
-    total_amount = _parse_number(fields.get("totalAmount"))
-    if total_amount is None:
-        total_amount = customer.get("totalAmount")
-    contract_years = _parse_contract_years(fields.get("contractYears"))
-    install_time_text = fields.get("installTime") or (customer.get("installTime") or {}).get("display")
-    contract_start = _parse_date(fields.get("contractStartDate") or install_time_text)
-    contract_end = _parse_date(fields.get("contractEndDate"))
-    expect_sign_date = _parse_date(fields.get("expectSignDate"))
-    expect_sign_money = _parse_number(fields.get("expectSignMoney")) or total_amount
+    monthly_fee = _coalesce_num(fget("monthlyFee"), cget("monthlyFee"))
+    deposit = _coalesce_num(fget("deposit"), cget("deposit"))
+    prepay = _coalesce_num(fget("prepay"), cget("prepay"))
+    total_amount = _coalesce_num(fget("totalAmount"), cget("totalAmount"))
+    contract_years = _parse_contract_years(fget("contractYears"))
+    install_time_text = fget("installTime") or install_time_info.get("display")
+    contract_start = _parse_date(fget("contractStartDate") or install_time_text)
+    contract_end = _parse_date(fget("contractEndDate"))
+    expect_sign_date = _parse_date(fget("expectSignDate"))
+    expect_sign_money = _parse_number(fget("expectSignMoney")) or total_amount
     if expect_sign_money is None and monthly_fee and contract_years:
         expect_sign_money = monthly_fee * contract_years * 12
-    expect_sign_num = _parse_int(fields.get("expectSignNum"))
-    currency = _normalize_currency(fields.get("currency")) or customer.get("currency") or "MOP"
-    payment_code = _normalize_payment_code(fields.get("paymentMethod"))
+    expect_sign_num = _parse_int(fget("expectSignNum"))
+    currency = _normalize_currency(fget("currency")) or cget("currency") or "MOP"
+    payment_code = _normalize_payment_code(fget("paymentMethod"))
     if not payment_code:
-        payment_code = (customer.get("paymentMethod") or {}).get("id")
+        payment_code = payment_method_info.get("id")
     if not payment_code:
         # 若方案類型是純數字碼（如 01/001），作為付款方式碼兜底
-        plan_raw = fields.get("planType") or ""
-        if re.fullmatch(r"\d{2,3}", plan_raw.strip()):
+        plan_raw = fget("planType") or ""
+        if _PAYMENT_CODE_FULL_RE.fullmatch(plan_raw.strip()):
             payment_code = plan_raw.strip()
     
-    winning_rate = _normalize_percentage(fields.get("winningRate")) or "0"
-    owner_hint = fields.get("ownerHint") or fields.get("salesName") or (customer.get("owner") or {}).get("name") or ""
+    winning_rate = _normalize_percentage(fget("winningRate")) or "0"
+    owner_hint = fget("ownerHint") or fget("salesName") or owner.get("name") or ""
     transaction_type = (
-        fields.get("transactionType")
-        or fields.get("customerCategory")
-        or (customer.get("customerClass") or {}).get("label")
+        fget("transactionType")
+        or fget("customerCategory")
+        or customer_class.get("label")
         or ""
     )
-    stage_hint = fields.get("opportunityStage")
-    contact_method = fields.get("contactMethod") or customer.get("contactTel") or fields.get("contactPhone")
-    remark = _combine_text(fields.get("remark"), customer.get("remark"))
-    contract_number = fields.get("contractNumber") or (customer.get("rawFields") or {}).get("contractNumber")
-    opportunity_date = _parse_date(fields.get("opportunityDate"))
+    stage_hint = fget("opportunityStage")
+    contact_method = fget("contactMethod") or cget("contactTel") or fget("contactPhone")
+    remark = _combine_text(fget("remark"), cget("remark"))
+    contract_number = fget("contractNumber") or (cget("rawFields") or {}).get("contractNumber")
+    opportunity_date = _parse_date(fget("opportunityDate"))
     if not contract_start and install_time_text:
         warnings.append("未取得合約開始日，已改用安裝時間。")
     if contract_start and not contract_end and contract_years:
@@ -504,23 +623,23 @@ def _build_context(fields: Dict[str, str], customer: Dict[str, Any]) -> Tuple[Di
         expect_sign_money = total_amount
     if not opportunity_date:
         opportunity_date = expect_sign_date or contract_start or date.today()
-    customer_code = customer.get("customerCode") or _extract_customer_code(fields.get("customerLine", ""), fields.get("customerName", ""))
+    customer_code = cget("customerCode") or _extract_customer_code(fget("customerLine", ""), fget("customerName", ""))
     customer_name = (
-        fields.get("customerName")
-        or customer.get("baseName")
-        or customer.get("displayName")
+        fget("customerName")
+        or cget("baseName")
+        or cget("displayName")
         or "客戶"
     )
-    contact_phone = customer.get("contactTel") or fields.get("contactPhone")
-    if not contact_phone and fields.get("customerLine"):
+    contact_phone = cget("contactTel") or fget("contactPhone")
+    if not contact_phone and fget("customerLine"):
         contact_phone = _extract_phone(fields["customerLine"])
-    plan_code = fields.get("planCode") or _extract_plan_code(plan_type or "")
+    plan_code = fget("planCode") or _extract_plan_code(plan_type or "")
     item_hint = {
-        "brand_name": fields.get("brandName") or "MAQUA",
-        "product_name": fields.get("productName") or plan_type or name,
+        "brand_name": fget("brandName") or "MAQUA",
+        "product_name": fget("productName") or plan_type or name,
         "product_code": plan_code or plan_type or customer_code or "",
-        "productClass_name": fields.get("productClassName") or transaction_type or "",
-        "productLine_name": fields.get("productLineName") or plan_type or "",
+        "productClass_name": fget("productClassName") or transaction_type or "",
+        "productLine_name": fget("productLineName") or plan_type or "",
         "manageClass_name": transaction_type or "",
     }
     context: Dict[str, Any] = {
@@ -552,12 +671,12 @@ def _build_context(fields: Dict[str, str], customer: Dict[str, Any]) -> Tuple[Di
         "customerName": customer_name,
         "customerCode": customer_code,
         "contactTel": contact_phone,
-        "address": install_location or customer.get("address"),
-        "saleAreaId": (customer.get("saleArea") or {}).get("id"),
-        "ownerId": (customer.get("owner") or {}).get("id"),
-        "ownerName": (customer.get("owner") or {}).get("name"),
-        "customerClassId": (customer.get("customerClass") or {}).get("id"),
-        "customerClassLabel": (customer.get("customerClass") or {}).get("label"),
+        "address": install_location or cget("address"),
+        "saleAreaId": sale_area.get("id"),
+        "ownerId": owner.get("id"),
+        "ownerName": owner.get("name"),
+        "customerClassId": customer_class.get("id"),
+        "customerClassLabel": customer_class.get("label"),
         "itemHint": item_hint,
     }
     if not contact_phone:
@@ -567,10 +686,9 @@ def _build_context(fields: Dict[str, str], customer: Dict[str, Any]) -> Tuple[Di
     return context, warnings
 
 
-def parse_opportunity_text(
-    text: str, customer_data: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
-    normalized = _normalize_customer(customer_data)
+@lru_cache(maxsize=256)
+def _parse_opportunity_cached(text: str, normalized_json: str) -> Dict[str, Any]:
+    normalized = json.loads(normalized_json)
     fields = _parse_lines(text)
     context, warnings = _build_context(fields, normalized)
     return {
@@ -580,11 +698,25 @@ def parse_opportunity_text(
     }
 
 
+def parse_opportunity_text(
+    text: str, customer_data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """解析商機文本。
+
+    同一段文案配同一筆客戶資料重送（重試、預覽）時直接取快取；
+    客戶 dict 不可雜湊，先序列化成排序後的 JSON 字串當鍵。
+    回傳前深拷貝，呼叫端可以放心就地修改。
+    """
+    normalized = _normalize_customer(customer_data)
+    key = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return copy.deepcopy(_parse_opportunity_cached(text, key))
+
+
 def _load_customer_json(path: Optional[str]) -> Optional[Dict[str, Any]]:
     if not path:
         return None
-    content = Path(path).read_text(encoding="utf-8")
-    data = json.loads(content)
+    raw = Path(path).read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     if isinstance(data, dict) and "normalized" in data:
         return data
     return data
@@ -619,12 +751,17 @@ def main() -> None:
 
     customer_data = _load_customer_json(args.customer_json)
     result = parse_opportunity_text(content, customer_data)
-    text = json.dumps(
-        result,
-        ensure_ascii=False,
-        indent=2 if args.pretty else None,
-    )
-    print(text)
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if args.pretty else 0
+        sys.stdout.buffer.write(orjson.dumps(result, option=option) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        text = json.dumps(
+            result,
+            ensure_ascii=False,
+            indent=2 if args.pretty else None,
+        )
+        print(text)
 
 
 if __name__ == "__main__":